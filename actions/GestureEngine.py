@@ -0,0 +1,101 @@
+import threading
+import time
+
+
+class GestureEngine:
+    """
+    Turn press/release events into short, double and long presses.
+
+    - Short press fires on release, immediately: it never waits to find out
+      whether a second press follows.
+    - A press starting within double_press_window of a short press release
+      is a double press, fired on its release instead of a second short press.
+    - Long press fires as soon as the key has been held for
+      long_press_threshold, without waiting for the release. If the callback
+      returns True, it is repeated every hold_repeat_interval while held.
+
+    Durations are measured on a monotonic clock, so wall-clock jumps
+    (NTP, suspend/resume) cannot turn a tap into a long press.
+    """
+
+    IDLE = "idle"
+    PRESSED = "pressed"
+    HELD = "held"
+
+    def __init__(self, on_short_press, on_long_press, on_double_press,
+                 long_press_threshold=0.5, double_press_window=0.3, hold_repeat_interval=0.2,
+                 clock=time.monotonic):
+        self.on_short_press = on_short_press
+        self.on_long_press = on_long_press
+        self.on_double_press = on_double_press
+        self.long_press_threshold = long_press_threshold
+        self.double_press_window = double_press_window
+        self.hold_repeat_interval = hold_repeat_interval
+        self.double_press_enabled = True
+        self.clock = clock
+
+        self.state = self.IDLE
+        self._lock = threading.Lock()
+        self._timer = None
+        self._press_id = 0
+        self._is_second_press = False
+        self._last_short_release = None
+
+    def press(self):
+        with self._lock:
+            if self.state != self.IDLE:
+                return
+            now = self.clock()
+            self.state = self.PRESSED
+            self._press_id += 1
+            self._is_second_press = (
+                self.double_press_enabled
+                and self._last_short_release is not None
+                and now - self._last_short_release <= self.double_press_window
+            )
+            self._start_timer(self.long_press_threshold, self._press_id)
+
+    def release(self):
+        with self._lock:
+            self._cancel_timer()
+            state, self.state = self.state, self.IDLE
+            if state != self.PRESSED:
+                # Long press already handled, or release without press
+                self._last_short_release = None
+                return
+            if self._is_second_press:
+                self._last_short_release = None
+                callback = self.on_double_press
+            else:
+                self._last_short_release = self.clock()
+                callback = self.on_short_press
+        callback()
+
+    def cancel(self):
+        """Drop any press in progress, e.g. when the action is removed"""
+        with self._lock:
+            self._cancel_timer()
+            self.state = self.IDLE
+            self._last_short_release = None
+
+    def _start_timer(self, delay, press_id):
+        self._timer = threading.Timer(delay, self._on_timer, args=(press_id,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_timer(self, press_id):
+        with self._lock:
+            # A release (or a newer press) since the timer started wins
+            if press_id != self._press_id or self.state == self.IDLE:
+                return
+            self.state = self.HELD
+            self._timer = None
+        repeat = self.on_long_press()
+        with self._lock:
+            if repeat and press_id == self._press_id and self.state == self.HELD:
+                self._start_timer(self.hold_repeat_interval, press_id)
@@ -4,6 +4,7 @@ from src.backend.PluginManager.ActionBase import ActionBase
 from src.backend.DeckManagement.DeckController import DeckController
 from src.backend.PageManagement.Page import Page
 from src.backend.PluginManager.ActionInputSupport import ActionInputSupport
+from src.backend.DeckManagement.InputIdentifier import Input
 from loguru import logger as log
 
 # Import python modules
@@ -15,8 +16,13 @@ import re
 import hashlib
 import threading
 
+try:
+    from .GestureEngine import GestureEngine
+except ImportError:
+    from actions.GestureEngine import GestureEngine
+
 # Import PIL for image composition
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 
 # Import gtk modules
 import gi
@@ -25,15 +31,109 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw
 
 class SwitchAudioAction(ActionBase):
+    # Write composed frames to cache/ in the background (optional persistence tier)
+    PERSIST_FRAMES = True
+
+    # Composed frames and resized icon layers, shared by all instances
+    _frame_cache = {}
+    _layer_cache = {}
+    _frame_cache_lock = threading.Lock()
+
+    # Stream Deck + touchscreen strip, one tile per configured output
+    TOUCHSCREEN_SIZE = (800, 100)
+    _tile_cache = {}
+
+    # Remember the last displayed state per configuration in cache/last_state.json
+    PERSIST_STATE = True
+    STATE_FILENAME = "last_state.json"
+    # Debounce delay before writing the last known states to disk
+    STATE_WRITE_DELAY = 2.0
+    # Every config edit makes a new key, only the most recently used ones are kept
+    MAX_LAST_STATES = 16
+
+    # Last known states keyed by configuration, shared by all instances
+    _last_states = None
+    _state_lock = threading.Lock()
+    _state_write_timer = None
+
+    # Trailing delay used to coalesce bursts of events into one refresh
+    REFRESH_DELAY = 0.1
+
+    # Delay used to batch new streams before routing them with a single query
+    ROUTING_DELAY = 0.05
+
+    # "Event 'change' on sink #57" lines from pactl subscribe
+    EVENT_PATTERN = re.compile(r"^Event '(\w+)' on ([\w-]+) #(\d+)$")
+
+    # Slot entries targeting a card profile: "card|<card>|<profile>[|<port>]"
+    CARD_TARGET_PREFIX = "card|"
+
+    # Time a card switch may wait for its device to appear before it is dropped
+    CARD_SWITCH_TIMEOUT = 5.0
+
+    # Device kinds a key can cycle, a slot's device of the other kind follows it
+    DEVICE_KINDS = ("sink", "source")
+
+    # Idle time after the last config edit before settings are written
+    SETTINGS_FLUSH_DELAY = 0.5
+
+    # Gesture timings (seconds), volume step and ceiling (%) used by the volume gestures
+    LONG_PRESS_THRESHOLD = 0.5
+    DOUBLE_PRESS_WINDOW = 0.3
+    HOLD_REPEAT_INTERVAL = 0.2
+    VOLUME_STEP = 5
+    MAX_VOLUME = 100
+
+    # Gesture action id -> (display name, repeats while held)
+    GESTURE_ACTIONS = {
+        "refresh": ("Refresh", False),
+        "previous": ("Previous Output", True),
+        "next": ("Next Output", True),
+        "volume_up": ("Volume Up", True),
+        "volume_down": ("Volume Down", True),
+        "none": ("Nothing", False),
+    }
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.old_state: int = None
         self.tick_counter = 0
-        self.key_press_time = None  # For long press detection
         self._loading_config = False
 
-        self.sink_model = Gtk.ListStore.new([str, str]) # Name, Display Name
+        # Config edits waiting to be written by flush_settings()
+        self._pending_settings = {}
+        self._pending_settings_refresh = False
+        self._settings_timer = None
+        self._settings_lock = threading.Lock()
+        # Serializes flushes: a timer flush already running is not stopped by cancel()
+        self._settings_write_lock = threading.Lock()
+
+        self.gestures = GestureEngine(
+            on_short_press=lambda: self.cycle_device(1),
+            on_long_press=lambda: self.perform_gesture(self.get_settings().get("long_press_action", "refresh")),
+            on_double_press=lambda: self.perform_gesture(
+                self.get_settings().get("double_press_action", "previous"), undo_short_press=True
+            ),
+            long_press_threshold=self.LONG_PRESS_THRESHOLD,
+            double_press_window=self.DOUBLE_PRESS_WINDOW,
+            hold_repeat_interval=self.HOLD_REPEAT_INTERVAL,
+        )
+
+        self.gesture_model = Gtk.ListStore.new([str]) # Gesture Action Id
+        self.gesture_display_model = Gtk.ListStore.new([str]) # Gesture Action Name
+        for action_id, (name, _) in self.GESTURE_ACTIONS.items():
+            self.gesture_model.append([action_id])
+            self.gesture_display_model.append([name])
+
+        # Name, Display Name, one model per device kind
+        self.device_models = {kind: Gtk.ListStore.new([str, str]) for kind in self.DEVICE_KINDS}
+
+        self.kind_model = Gtk.ListStore.new([str]) # Device Kind
+        self.kind_display_model = Gtk.ListStore.new([str]) # Device Kind Name
+        for kind, name in [("sink", "Output"), ("source", "Input")]:
+            self.kind_model.append([kind])
+            self.kind_display_model.append([name])
 
         self.icon_model = Gtk.ListStore.new([str]) # Icon Filename
         self.icon_display_model = Gtk.ListStore.new([str]) # Icon Name
@@ -62,59 +162,114 @@ class SwitchAudioAction(ActionBase):
         # Track cache files used by this instance for cleanup
         self.used_cache_files = set()
 
+        # Touchscreen strip: canvas kept between refreshes and the tile drawn in each region
+        self._strip_canvas = None
+        self._strip_slots = []
+        self._strip_tile_keys = []
+        # Refreshes run on the timer, initial-refresh and input threads
+        self._strip_lock = threading.Lock()
+
         # Event listener thread
         self.event_listener_thread = None
         self.event_listener_running = False
         self.event_listener_process = None
 
+        # Pending coalesced refresh
+        self._refresh_timer = None
+        self._refresh_lock = threading.Lock()
+
+        # Card/profile index, rebuilt only when a card event marks it dirty
+        self._cards = {}
+        self._cards_dirty = True
+        self._cards_lock = threading.Lock()
+
+        # Card switches waiting for their device to appear: kind -> (card, profile, port, deadline)
+        self._pending_card_targets = {}
+
+        # Sinks seen by the last refresh, reused to route new streams
+        self._last_available_sinks = None
+
+        # Per-application routing: compiled rules and new streams to route
+        self._routing_index = {}
+        self._routing_index_source = None
+        self._pending_stream_ids = set()
+        self._routing_timer = None
+        self._routing_lock = threading.Lock()
+
     def on_ready(self):
         self.old_state = None
-        self.cleanup_old_cache_files()
+        # The deck does not keep the strip between pages, repaint every region
+        with self._strip_lock:
+            self._strip_canvas = None
+        # Cache housekeeping touches the disk, keep it off the first refresh
+        threading.Thread(target=self.cleanup_old_cache_files, daemon=True, name="icon-cache-cleanup").start()
         self.start_event_listener()
-        self.show_state()
+        if self.show_last_known_state():
+            # Reconcile with live data without holding up the first frame
+            threading.Thread(target=self.show_state, daemon=True, name="initial-refresh").start()
+        else:
+            self.show_state()
 
     def on_destroy(self):
         """Clean up cache files used by this instance when action is removed"""
+        self.gestures.cancel()
+        self.flush_settings(refresh=False)
         self.stop_event_listener()
         self.cleanup_instance_cache_files()
 
     def show_state(self) -> None:
         settings = self.get_settings()
-        available_sinks = self.get_available_sinks()
+        # Only the kind cycled by this key is queried, linked devices are not displayed
+        kind = self._get_device_kind(settings)
+        available_devices = self.get_available_devices(kind)
+        if kind == "sink":
+            self._last_available_sinks = available_devices
 
-        # Build list of configured and available sinks with their indices
+        # Build list of configured and available devices with their indices
         available_configs = []
         for i, key_suffix in enumerate(["a", "b", "c"]):
-            sink_names = self._get_sink_names(settings, key_suffix)
-            if self._get_first_available_sink(sink_names, available_sinks):
+            device_names = self._get_device_names(settings, kind, key_suffix)
+            if self._get_first_available_device(device_names, available_devices):
                 available_configs.append(i)
 
         if not available_configs:
-            # No available sinks - show error or default state
+            # No available devices - show error or default state
             volume = "--"
-            self.set_bottom_label(volume, font_size=12)
+            if self._is_on_touchscreen():
+                # Every configured device dimmed, none highlighted
+                self._render_strip(settings, available_configs, -1, volume)
+            else:
+                self.set_bottom_label(volume, font_size=12)
             return
 
+        active_index = self.get_active_slot_index(kind)
+        volume = self.get_volume(kind)
+
+        frame_key = self._render_state(settings, available_configs, active_index, volume)
+
+        self._remember_state(settings, {
+            "available_devices": sorted(available_devices),
+            "available_slots": available_configs,
+            "active_slot": active_index,
+            "volume": volume,
+            "frame": frame_key,
+        })
+
+    def _render_state(self, settings, available_configs, active_index, volume):
+        """Draw the key for the given slots, returns the cache key of the frame"""
+        if self._is_on_touchscreen():
+            self._render_strip(settings, available_configs, active_index, volume)
+            return None
+
         # Find current active sink in available configs
-        active_index = self.get_active_sink_index()
         current_position = -1
         if active_index in available_configs:
             current_position = available_configs.index(active_index)
         else:
             current_position = 0
 
-        icon_color = settings.get("icon_color", "white")
-
         def get_icon_path(idx):
-            key_suffix = ["a", "b", "c"][idx]
-            icon_name = settings.get(f"icon_{key_suffix}", "Speaker")
-            filename = self.icons.get(icon_name, "speaker.png")
-
-            # Use _w suffix for white icons
-            if icon_color == "white":
-                filename = filename.replace(".png", "_w.png")
-
-            return os.path.join(self.plugin_base.PATH, "assets", filename)
+            return self._get_icon_path(settings, idx)
 
         # Get icon paths based on available sinks
         current_idx = available_configs[current_position]
@@ -134,81 +289,338 @@ class SwitchAudioAction(ActionBase):
             prev_idx = available_configs[prev_position]
             prev_icon_path = get_icon_path(prev_idx)
 
-        volume = self.get_volume()
-
-        image_path = self.generate_composite_icon(current_icon_path, prev_icon_path, next_icon_path)
+        image = self.generate_composite_icon(current_icon_path, prev_icon_path, next_icon_path)
 
-        if image_path:
-            self.set_media(media_path=image_path, size=1.0)
+        if image is not None:
+            # Hand the composed frame to the deck directly, no PNG round trip
+            self.set_media(image=image, size=1.0)
 
         # Set volume as bottom label to use configured color
         self.set_bottom_label(volume, font_size=12)
 
+        return self._generate_cache_key(current_icon_path, prev_icon_path, next_icon_path)
+
+    def _get_icon_path(self, settings, idx):
+        key_suffix = ["a", "b", "c"][idx]
+        icon_name = settings.get(f"icon_{key_suffix}", "Speaker")
+        filename = self.icons.get(icon_name, "speaker.png")
+
+        # Use _w suffix for white icons
+        if settings.get("icon_color", "white") == "white":
+            filename = filename.replace(".png", "_w.png")
+
+        return os.path.join(self.plugin_base.PATH, "assets", filename)
+
+    # --- Touchscreen Strip ---
+
+    def _is_on_touchscreen(self):
+        return isinstance(getattr(self, "input_ident", None), Input.Touchscreen)
+
+    def _render_strip(self, settings, available_configs, active_index, volume):
+        """
+        Draw every configured device on the touchscreen strip.
+
+        The strip is split into one region per configured device. Tiles are
+        cached per state, and only the regions whose tile changed are
+        repainted on the kept canvas; nothing is sent when none changed.
+        """
+        kind = self._get_device_kind(settings)
+        slots = [i for i, key_suffix in enumerate(["a", "b", "c"]) if self._get_device_names(settings, kind, key_suffix)]
+        if not slots:
+            return
+
+        width, height = self.TOUCHSCREEN_SIZE
+        tile_width = width // len(slots)
+        color = settings.get("icon_color", "white")
+
+        with self._strip_lock:
+            if self._strip_canvas is None or self._strip_slots != slots:
+                self._strip_canvas = Image.new("RGBA", self.TOUCHSCREEN_SIZE, (0, 0, 0, 0))
+                self._strip_slots = slots
+                self._strip_tile_keys = [None] * len(slots)
+
+            changed = False
+            for position, slot in enumerate(slots):
+                active = slot == active_index
+                tile_key = (
+                    self._get_icon_path(settings, slot),
+                    (tile_width, height),
+                    slot in available_configs,
+                    active,
+                    volume if active else None,
+                    color,
+                )
+                if tile_key == self._strip_tile_keys[position]:
+                    continue
+                tile = self._render_strip_tile(*tile_key)
+                region = (position * tile_width, 0)
+                self._strip_canvas.paste(tile, region)
+                self._strip_tile_keys[position] = tile_key
+                changed = True
+
+            if changed:
+                # The deck keeps the image it is given, hand it a snapshot of the canvas
+                self.set_media(image=self._strip_canvas.copy(), size=1.0)
+
+    def _render_strip_tile(self, icon_path, tile_size, available, active, volume, color):
+        """One output on the strip: icon (dimmed if unavailable), volume and marker if active"""
+        width, height = tile_size
+        fill = (255, 255, 255, 255) if color == "white" else (0, 0, 0, 255)
+
+        # The volume is not part of the key, so the cache stays bounded by
+        # icons x sizes x colors; the label is drawn on a copy
+        tile_key = (os.path.basename(icon_path), tile_size, available, active, color)
+        with SwitchAudioAction._frame_cache_lock:
+            tile = SwitchAudioAction._tile_cache.get(tile_key)
+        if tile is None:
+            tile = Image.new("RGBA", tile_size, (0, 0, 0, 0))
+            icon_side = min(height - 40, width - 10)
+            icon = self._load_icon_layer(icon_path, (icon_side, icon_side), opacity=255 if available else 77) # 30% opacity
+            tile.alpha_composite(icon, ((width - icon_side) // 2, 8))
+            if active:
+                ImageDraw.Draw(tile).rectangle((8, height - 5, width - 9, height - 2), fill=fill)
+            with SwitchAudioAction._frame_cache_lock:
+                SwitchAudioAction._tile_cache[tile_key] = tile
+
+        if not active:
+            return tile
+        tile = tile.copy()
+        label = f"{volume}%" if volume.isdigit() else volume
+        ImageDraw.Draw(tile).text((width // 2, height - 18), label, fill=fill, anchor="mm", font=self._get_strip_font())
+        return tile
+
+    def _get_strip_font(self):
+        try:
+            return ImageFont.load_default(size=18)
+        except TypeError:
+            # Pillow < 10.1 only has the fixed-size bitmap font
+            return ImageFont.load_default()
+
+    def _get_strip_slot_at(self, x):
+        """Output slot under an x coordinate of the strip, or None"""
+        with self._strip_lock:
+            slots = list(self._strip_slots)
+        if not slots:
+            return None
+        position = int(x) * len(slots) // self.TOUCHSCREEN_SIZE[0]
+        return slots[max(0, min(position, len(slots) - 1))]
+
+    def event_callback(self, event, data=None):
+        if self._is_on_touchscreen():
+            if event == Input.Touchscreen.Events.DRAG_RIGHT:
+                self.cycle_device(1)
+                return
+            if event == Input.Touchscreen.Events.DRAG_LEFT:
+                self.cycle_device(-1)
+                return
+            if event == Input.Touchscreen.Events.SHORT and isinstance(data, dict) and "x" in data:
+                slot = self._get_strip_slot_at(data["x"])
+                if slot is not None:
+                    self.select_slot(slot)
+                return
+        super().event_callback(event, data)
+
+    # --- Last Known State ---
+
+    def show_last_known_state(self):
+        """
+        Draw the last state persisted for this configuration, without querying pactl.
+
+        Returns:
+            bool: True if a frame was drawn
+        """
+        if not self.PERSIST_STATE:
+            return False
+        settings = self.get_settings()
+        state = self._get_last_states().get(self._get_state_key(settings))
+        if not state or not state.get("available_slots"):
+            return False
+
+        try:
+            # Touchscreen states have no key frame
+            if state["frame"] is not None:
+                self._load_persisted_frame(state["frame"])
+            if self._get_device_kind(settings) == "sink":
+                self._last_available_sinks = set(state["available_devices"])
+            self._render_state(settings, state["available_slots"], state["active_slot"], state["volume"])
+            return True
+        except Exception as e:
+            log.error(f"Error showing last known state: {e}")
+            return False
+
+    def _get_state_key(self, settings):
+        """States are shared by instances with the same devices and icons"""
+        config = {key: value for key, value in settings.items() if key.startswith(("sink_", "source_", "icon_"))}
+        config["device_kind"] = self._get_device_kind(settings)
+        return hashlib.md5(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+    def _get_last_states(self):
+        with SwitchAudioAction._state_lock:
+            if SwitchAudioAction._last_states is None:
+                path = os.path.join(self.cache_dir, self.STATE_FILENAME)
+                try:
+                    with open(path) as f:
+                        SwitchAudioAction._last_states = json.load(f)
+                except FileNotFoundError:
+                    SwitchAudioAction._last_states = {}
+                except Exception as e:
+                    log.error(f"Error reading last known state: {e}")
+                    SwitchAudioAction._last_states = {}
+            return SwitchAudioAction._last_states
+
+    def _remember_state(self, settings, state):
+        """Record the displayed state and schedule a debounced write if it changed"""
+        if not self.PERSIST_STATE:
+            return
+        states = self._get_last_states()
+        state_key = self._get_state_key(settings)
+        with SwitchAudioAction._state_lock:
+            unchanged = states.get(state_key) == state
+            # Re-inserted, so the dict stays in least to most recently used order
+            states.pop(state_key, None)
+            states[state_key] = state
+            if unchanged:
+                return
+            while len(states) > self.MAX_LAST_STATES:
+                del states[next(iter(states))]
+            if SwitchAudioAction._state_write_timer is None:
+                path = os.path.join(self.cache_dir, self.STATE_FILENAME)
+                timer = threading.Timer(self.STATE_WRITE_DELAY, SwitchAudioAction._write_last_states, args=(path,))
+                timer.daemon = True
+                SwitchAudioAction._state_write_timer = timer
+                timer.start()
+
+    @staticmethod
+    def _write_last_states(path):
+        with SwitchAudioAction._state_lock:
+            SwitchAudioAction._state_write_timer = None
+            data = json.dumps(SwitchAudioAction._last_states)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            log.error(f"Error writing last known state: {e}")
+
+    def _load_persisted_frame(self, cache_key):
+        """Warm the in-memory frame cache from the disk tier, for the first frame after a start"""
+        with SwitchAudioAction._frame_cache_lock:
+            if cache_key in SwitchAudioAction._frame_cache:
+                return
+        cache_path = os.path.join(self.cache_dir, f"icon_{cache_key}.png")
+        if not os.path.exists(cache_path):
+            return
+        with Image.open(cache_path) as img:
+            frame = img.convert("RGBA")
+        with SwitchAudioAction._frame_cache_lock:
+            SwitchAudioAction._frame_cache.setdefault(cache_key, frame)
+
     def generate_composite_icon(self, current_path, prev_path, next_path):
+        """
+        Compose the key image for the given icons.
+
+        Frames are kept in memory and shared between instances. The PNG in
+        cache/ is only written in the background as a persistence tier, so a
+        refresh never touches the filesystem once the assets are loaded.
+
+        Returns:
+            PIL.Image: The composed 144x144 frame, or None on error
+        """
         try:
             # Generate hash based on icon paths for cache lookup
             cache_key = self._generate_cache_key(current_path, prev_path, next_path)
             cache_filename = f"icon_{cache_key}.png"
-            cache_path = os.path.join(self.cache_dir, cache_filename)
 
-            # Check if cached version exists
-            if os.path.exists(cache_path):
-                log.debug(f"Using cached icon: {cache_filename}")
+            with SwitchAudioAction._frame_cache_lock:
+                canvas = SwitchAudioAction._frame_cache.get(cache_key)
+            if canvas is not None:
                 self.used_cache_files.add(cache_filename)
-                return cache_path
+                return canvas
 
             # Generate new composite icon
             log.info(f"Generating new composite icon: {cache_filename}")
             size = (144, 144)
             canvas = Image.new("RGBA", size, (0, 0, 0, 0))
 
-            def load_and_resize(path, target_size, opacity=255):
-                try:
-                    if not os.path.exists(path):
-                        # Fallback
-                        img = Image.new("RGBA", target_size, (0,0,0,0))
-                        draw = ImageDraw.Draw(img)
-                        draw.ellipse((0,0,target_size[0],target_size[1]), fill=(255,255,255,255))
-                    else:
-                        img = Image.open(path).convert("RGBA")
-                        img = img.resize(target_size, Image.Resampling.LANCZOS)
-
-                    if opacity < 255:
-                        r, g, b, a = img.split()
-                        a = a.point(lambda p: p * (opacity / 255))
-                        img = Image.merge("RGBA", (r, g, b, a))
-                    return img
-                except Exception as e:
-                    log.error(f"Error loading image {path}: {e}")
-                    return Image.new("RGBA", target_size, (0, 0, 0, 0))
-
             # Center Icon (Active)
             center_size = (100, 100)
-            center_img = load_and_resize(current_path, center_size, opacity=255)
+            center_img = self._load_icon_layer(current_path, center_size, opacity=255)
             center_pos = ((size[0] - center_size[0]) // 2, (size[1] - center_size[1]) // 2 + 5)
             canvas.alpha_composite(center_img, center_pos)
 
             # Prev Icon (Top Left) - only if provided
             if prev_path is not None:
                 corner_size = (50, 50)
-                prev_img = load_and_resize(prev_path, corner_size, opacity=179) # 70% opacity
+                prev_img = self._load_icon_layer(prev_path, corner_size, opacity=179) # 70% opacity
                 canvas.alpha_composite(prev_img, (5, 5))
 
             # Next Icon (Top Right) - only if provided
             if next_path is not None:
                 corner_size = (50, 50)
-                next_img = load_and_resize(next_path, corner_size, opacity=179) # 70% opacity
+                next_img = self._load_icon_layer(next_path, corner_size, opacity=179) # 70% opacity
                 canvas.alpha_composite(next_img, (size[0] - corner_size[0] - 5, 5))
 
-            # Save to cache
-            canvas.save(cache_path)
+            with SwitchAudioAction._frame_cache_lock:
+                SwitchAudioAction._frame_cache[cache_key] = canvas
             self.used_cache_files.add(cache_filename)
-            return cache_path
+
+            if self.PERSIST_FRAMES:
+                self._persist_frame_async(canvas, os.path.join(self.cache_dir, cache_filename))
+            return canvas
 
         except Exception as e:
             log.error(f"Error generating composite icon: {e}")
             return None
 
+    def _load_icon_layer(self, path, target_size, opacity=255):
+        """Load, resize and fade an asset icon, memoized per (path, size, opacity)"""
+        layer_key = (path, target_size, opacity)
+        with SwitchAudioAction._frame_cache_lock:
+            img = SwitchAudioAction._layer_cache.get(layer_key)
+        if img is not None:
+            return img
+
+        try:
+            if not os.path.exists(path):
+                # Fallback
+                img = Image.new("RGBA", target_size, (0,0,0,0))
+                draw = ImageDraw.Draw(img)
+                draw.ellipse((0,0,target_size[0],target_size[1]), fill=(255,255,255,255))
+            else:
+                img = Image.open(path).convert("RGBA")
+                img = img.resize(target_size, Image.Resampling.LANCZOS)
+
+            if opacity < 255:
+                r, g, b, a = img.split()
+                a = a.point(lambda p: p * (opacity / 255))
+                img = Image.merge("RGBA", (r, g, b, a))
+        except Exception as e:
+            log.error(f"Error loading image {path}: {e}")
+            return Image.new("RGBA", target_size, (0, 0, 0, 0))
+
+        with SwitchAudioAction._frame_cache_lock:
+            SwitchAudioAction._layer_cache[layer_key] = img
+        return img
+
+    def _persist_frame_async(self, image, cache_path):
+        """Write a composed frame to the disk cache without blocking the caller"""
+        def write():
+            if os.path.exists(cache_path):
+                return
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            try:
+                image.save(tmp_path, format="PNG")
+                os.replace(tmp_path, cache_path)
+            except Exception as e:
+                log.error(f"Error persisting composite icon {cache_path}: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+        threading.Thread(target=write, daemon=True, name="icon-cache-writer").start()
+
     def _generate_cache_key(self, current_path, prev_path, next_path):
         """Generate a deterministic hash based on icon paths"""
         # Use just filenames to make hash more stable
@@ -282,6 +694,16 @@ class SwitchAudioAction(ActionBase):
 
         self.event_listener_running = False
 
+        with self._refresh_lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+        with self._routing_lock:
+            if self._routing_timer is not None:
+                self._routing_timer.cancel()
+                self._routing_timer = None
+            self._pending_stream_ids.clear()
+
         # Terminate the pactl subprocess
         if self.event_listener_process:
             try:
@@ -326,14 +748,7 @@ class SwitchAudioAction(ActionBase):
                     if not line:
                         continue
 
-
-                    # Check if it's a sink-related event
-                    if "sink" in line.lower():
-                        log.info(f"Sink event detected, refreshing display: {line}")
-                        # Update display on main thread (GTK operations must be on main thread)
-                        # We use a small delay to avoid too many rapid updates
-                        time.sleep(0.1)
-                        self.show_state()
+                    self._handle_event_line(line)
 
                 except Exception as e:
                     if self.event_listener_running:
@@ -350,9 +765,154 @@ class SwitchAudioAction(ActionBase):
                     pass
             log.debug("Event listener worker terminated")
 
+    def _handle_event_line(self, line):
+        """
+        Update the card index and refresh the display for one pactl event.
+
+        Returns:
+            bool: True if the event scheduled a refresh
+        """
+        match = self.EVENT_PATTERN.match(line)
+        if not match:
+            return False
+        event, facility, index = match.group(1), match.group(2), int(match.group(3))
+
+        if facility == "card":
+            self._on_card_event(event, index)
+        elif not facility.startswith(self.DEVICE_KINDS):
+            return False
+        elif event == "new" and facility in self._pending_card_targets:
+            self._complete_card_switch(facility)
+        elif facility == "sink-input" and event == "new":
+            self._queue_stream_routing(index)
+
+        # Sink and source events share the subscription, only the displayed kind refreshes
+        if facility != "card" and not facility.startswith(self._get_device_kind(self.get_settings())):
+            return False
+
+        log.debug(f"Audio event detected, scheduling refresh: {line}")
+        self._schedule_refresh()
+        return True
+
+    def _schedule_refresh(self):
+        """Coalesce bursts of events into a single trailing refresh"""
+        with self._refresh_lock:
+            if self._refresh_timer is not None:
+                return
+            self._refresh_timer = threading.Timer(self.REFRESH_DELAY, self._run_scheduled_refresh)
+            self._refresh_timer.daemon = True
+            self._refresh_timer.start()
+
+    def _run_scheduled_refresh(self):
+        with self._refresh_lock:
+            self._refresh_timer = None
+        # Events arriving from here on schedule the next refresh
+        self.show_state()
+
+    def _on_card_event(self, event, index):
+        with self._cards_lock:
+            if event == "remove":
+                # No query needed, just drop the card from the index
+                self._cards = {name: card for name, card in self._cards.items() if card["index"] != index}
+            else:
+                self._cards_dirty = True
+
+    # --- Per-Application Routing ---
+
+    def _get_routing_index(self, settings):
+        """
+        Compile the apps_a/b/c settings into a lookup of application -> slot.
+
+        Keys are lowercased application names or binaries. The index is only
+        rebuilt when the rules change.
+        """
+        source = tuple(tuple(self._get_app_names(settings, key_suffix)) for key_suffix in ["a", "b", "c"])
+        if source != self._routing_index_source:
+            index = {}
+            for i, app_names in enumerate(source):
+                for app_name in app_names:
+                    # First slot listing an application wins
+                    index.setdefault(app_name.strip().lower(), i)
+            self._routing_index = index
+            self._routing_index_source = source
+        return self._routing_index
+
+    def _queue_stream_routing(self, stream_id):
+        """Batch new streams so a burst is routed with one sink-input listing"""
+        if not self._get_routing_index(self.get_settings()):
+            return
+        with self._routing_lock:
+            self._pending_stream_ids.add(stream_id)
+            if self._routing_timer is not None:
+                return
+            self._routing_timer = threading.Timer(self.ROUTING_DELAY, self._route_pending_streams)
+            self._routing_timer.daemon = True
+            self._routing_timer.start()
+
+    def _route_pending_streams(self):
+        with self._routing_lock:
+            stream_ids = self._pending_stream_ids
+            self._pending_stream_ids = set()
+            self._routing_timer = None
+
+        settings = self.get_settings()
+        routing_index = self._get_routing_index(settings)
+        if not routing_index or not stream_ids:
+            return
+
+        available_sinks = self._last_available_sinks
+        if available_sinks is None:
+            available_sinks = self.get_available_sinks()
+
+        commands = []
+        for stream in self.get_sink_inputs():
+            if stream["index"] not in stream_ids:
+                continue
+            slot = None
+            for app_name in (stream["application"], stream["binary"]):
+                if app_name and app_name.lower() in routing_index:
+                    slot = routing_index[app_name.lower()]
+                    break
+            if slot is None:
+                continue
+            sink_name = self._resolve_slot_sink(settings, ["a", "b", "c"][slot], available_sinks)
+            if sink_name:
+                commands.append(["move-sink-input", str(stream["index"]), sink_name])
+
+        # Streams are independent, one failed move must not block the others
+        for command in commands:
+            if self._run_pactl_batch([command]):
+                log.info(f"Routed stream #{command[1]} to {command[2]}")
+
+    def _resolve_slot_sink(self, settings, key_suffix, available_sinks):
+        """Sink currently backing a slot, without switching any card profile"""
+        target = self._get_first_available_device(self._get_sink_names(settings, key_suffix), available_sinks)
+        if not target:
+            return None
+        card_target = self._parse_card_target(target)
+        if not card_target:
+            return target
+        card_name, profile_name, _ = card_target
+        card = self.get_card_index().get(card_name)
+        if card is None or card["active_profile"] != profile_name:
+            return None
+        return self._resolve_card_device("sink", card_name, profile_name, available_sinks)
+
     def get_config_rows(self) -> list:
         rows = []
-        self.load_sink_model()
+        # The rows must show edits still waiting in the debounce window
+        self.flush_settings()
+        for kind in self.DEVICE_KINDS:
+            self.load_device_model(kind)
+
+        # Kind of device cycled by the key, the other kind follows as linked devices
+        kind_row = ComboRow(title="Device Type", model=self.kind_display_model)
+        kind_renderer = Gtk.CellRendererText()
+        kind_row.combo_box.pack_start(kind_renderer, True)
+        kind_row.combo_box.add_attribute(kind_renderer, "text", 0)
+        kind_row.combo_box.connect("changed", self.on_kind_change)
+        self.kind_row = kind_row
+        rows.append(kind_row)
 
         # Icon color selection
         color_row = ComboRow(title="Icon Color", model=self.color_display_model)
@@ -360,29 +920,47 @@ class SwitchAudioAction(ActionBase):
         color_row.combo_box.pack_start(color_renderer, True)
         color_row.combo_box.add_attribute(color_renderer, "text", 0)
         color_row.combo_box.connect("changed", self.on_color_change)
+        # Write pending edits right away when the config pane goes away
+        color_row.connect("unrealize", lambda *args: self.flush_settings())
         self.color_row = color_row
         rows.append(color_row)
 
-        self._sink_checkbuttons = {}
+        # Gesture actions
+        self.gesture_rows = {}
+        for setting, title in [("long_press_action", "Long Press"), ("double_press_action", "Double Press")]:
+            gesture_row = ComboRow(title=title, model=self.gesture_display_model)
+            gesture_renderer = Gtk.CellRendererText()
+            gesture_row.combo_box.pack_start(gesture_renderer, True)
+            gesture_row.combo_box.add_attribute(gesture_renderer, "text", 0)
+            gesture_row.combo_box.connect("changed", self.on_gesture_change, setting)
+            self.gesture_rows[setting] = gesture_row
+            rows.append(gesture_row)
+
+        self._device_checkbuttons = {}
 
         for i, label in enumerate(["A", "B", "C"]):
-            # ExpanderRow with CheckButtons for multiselect sinks
-            expander = Adw.ExpanderRow(title=f"Output {label}")
-            self._sink_checkbuttons[i] = []
-
-            for idx in range(len(self.sink_model)):
-                sink_name = self.sink_model[idx][0]
-                display_name = self.sink_model[idx][1]
-
-                action_row = Adw.ActionRow(title=display_name)
-                action_row.set_title_lines(1)
-                check = Gtk.CheckButton()
-                check.sink_name = sink_name
-                check.connect("toggled", self.on_sink_toggle, i)
-                action_row.add_prefix(check)
-                action_row.set_activatable_widget(check)
-                expander.add_row(action_row)
-                self._sink_checkbuttons[i].append(check)
+            for kind, title in [("sink", "Output"), ("source", "Input")]:
+                # ExpanderRow with CheckButtons for multiselect devices
+                expander = Adw.ExpanderRow(title=f"{title} {label}")
+                self._device_checkbuttons[(kind, i)] = []
+
+                device_model = self.device_models[kind]
+                for idx in range(len(device_model)):
+                    device_name = device_model[idx][0]
+                    display_name = device_model[idx][1]
+
+                    action_row = Adw.ActionRow(title=display_name)
+                    action_row.set_title_lines(1)
+                    check = Gtk.CheckButton()
+                    check.device_name = device_name
+                    check.connect("toggled", self.on_device_toggle, i, kind)
+                    action_row.add_prefix(check)
+                    action_row.set_activatable_widget(check)
+                    expander.add_row(action_row)
+                    self._device_checkbuttons[(kind, i)].append(check)
+
+                rows.append(expander)
+                setattr(self, f"{kind}_expander_{i}", expander)
 
             icon_row = ComboRow(title=f"Icon {label}", model=self.icon_display_model)
             icon_renderer = Gtk.CellRendererText()
@@ -390,40 +968,85 @@ class SwitchAudioAction(ActionBase):
             icon_row.combo_box.add_attribute(icon_renderer, "text", 0)
             icon_row.combo_box.connect("changed", self.on_icon_change, i)
 
-            rows.append(expander)
+            # Applications whose new streams are routed to this output
+            apps_row = Adw.EntryRow(title=f"Applications {label} (séparées par des virgules)")
+            apps_row.set_show_apply_button(True)
+            apps_row.connect("apply", self.on_apps_apply, i)
+
             rows.append(icon_row)
+            rows.append(apps_row)
 
-            setattr(self, f"sink_expander_{i}", expander)
             setattr(self, f"icon_row_{i}", icon_row)
+            setattr(self, f"apps_row_{i}", apps_row)
 
         self.load_config_settings()
         return rows
 
-    def load_sink_model(self):
-        self.sink_model.clear()
-        sinks = self.get_sinks()
-        available_sinks = self.get_available_sinks()
+    def load_device_model(self, kind):
+        device_model = self.device_models[kind]
+        device_model.clear()
+        devices = self.get_devices(kind)
+        available_devices = self.get_available_devices(kind)
 
-        system_sink_names = set()
-        for sink in sinks:
-            system_sink_names.add(sink['name'])
-            display_name = f"{sink['description']} ({sink['name']})"
+        system_device_names = set()
+        for device in devices:
+            system_device_names.add(device['name'])
+            display_name = f"{device['description']} ({device['name']})"
 
-            # Mark unavailable sinks
-            if sink['name'] not in available_sinks:
+            # Mark unavailable devices
+            if device['name'] not in available_devices:
                 display_name += " (déconnecté)"
 
-            self.sink_model.append([sink['name'], display_name])
+            device_model.append([device['name'], display_name])
+
+        # Add card profiles/ports, so devices that only exist once a
+        # profile is selected (HDMI, A2DP/HFP) can be assigned to a slot
+        for target, display_name, available in self._get_card_targets(kind):
+            system_device_names.add(target)
+            if not available:
+                display_name += " (déconnecté)"
+            device_model.append([target, display_name])
 
-        # Add saved sinks that are no longer in the system
+        # Add saved devices that are no longer in the system
         settings = self.get_settings()
         for key_suffix in ["a", "b", "c"]:
-            sink_names = self._get_sink_names(settings, key_suffix)
-            for name in sink_names:
-                if name and name not in system_sink_names:
-                    system_sink_names.add(name)
-                    display_name = f"{name} (déconnecté)"
-                    self.sink_model.append([name, display_name])
+            device_names = self._get_device_names(settings, kind, key_suffix)
+            for name in device_names:
+                if name and name not in system_device_names:
+                    system_device_names.add(name)
+                    display_name = f"{self._describe_card_target(name) or name} (déconnecté)"
+                    device_model.append([name, display_name])
+
+    def _get_card_targets(self, kind="sink"):
+        """
+        List selectable card targets from the card index.
+
+        Returns:
+            list: (target, display name, available) for each profile with
+                  devices of the given kind, split per port when the
+                  profile has several
+        """
+        # Ports of the other direction are named "...-input-..." / "...-output-..."
+        other_direction = "input" if kind == "sink" else "output"
+        targets = []
+        for card_name, card in sorted(self.get_card_index().items()):
+            for profile_name, profile in card["profiles"].items():
+                if profile[f"{kind}s"] == 0:
+                    continue
+                display_name = f"{card['description']} : {profile['description']} ({profile_name})"
+                ports = [
+                    port_name for port_name, port in card["ports"].items()
+                    if profile_name in port["profiles"] and other_direction not in port_name
+                ]
+                if len(ports) < 2:
+                    target = self._make_card_target(card_name, profile_name)
+                    targets.append((target, display_name, self._is_card_target_available(card_name, profile_name, None)))
+                    continue
+                for port_name in ports:
+                    target = self._make_card_target(card_name, profile_name, port_name)
+                    port_display = f"{display_name} / {card['ports'][port_name]['description']}"
+                    targets.append((target, port_display, self._is_card_target_available(card_name, profile_name, port_name)))
+        return targets
 
     def load_config_settings(self):
         self._loading_config = True
@@ -437,21 +1060,44 @@ class SwitchAudioAction(ActionBase):
                 self.color_row.combo_box.set_active(idx)
                 break
 
+        # Load device kind
+        kind = self._get_device_kind(settings)
+        self.kind_row.combo_box.set_active(-1)
+        for idx, row in enumerate(self.kind_model):
+            if row[0] == kind:
+                self.kind_row.combo_box.set_active(idx)
+                break
+
+        # Load gesture actions
+        for setting, default in [("long_press_action", "refresh"), ("double_press_action", "previous")]:
+            action_id = settings.get(setting, default)
+            gesture_row = self.gesture_rows[setting]
+            gesture_row.combo_box.set_active(-1)
+            for idx, row in enumerate(self.gesture_model):
+                if row[0] == action_id:
+                    gesture_row.combo_box.set_active(idx)
+                    break
+
         for i, key_suffix in enumerate(["a", "b", "c"]):
-            sink_names = self._get_sink_names(settings, key_suffix)
             icon_name = settings.get(f"icon_{key_suffix}")
 
-            # Check the checkbuttons for saved sinks
-            selected_count = 0
-            for check in self._sink_checkbuttons[i]:
-                is_selected = check.sink_name in sink_names
-                check.set_active(is_selected)
-                if is_selected:
-                    selected_count += 1
+            for kind in self.DEVICE_KINDS:
+                device_names = self._get_device_names(settings, kind, key_suffix)
+
+                # Check the checkbuttons for saved devices
+                selected_count = 0
+                for check in self._device_checkbuttons[(kind, i)]:
+                    is_selected = check.device_name in device_names
+                    check.set_active(is_selected)
+                    if is_selected:
+                        selected_count += 1
+
+                # Update expander subtitle with selection count
+                expander = getattr(self, f"{kind}_expander_{i}")
+                expander.set_subtitle(self._get_selection_subtitle(kind, selected_count))
 
-            # Update expander subtitle with selection count
-            expander = getattr(self, f"sink_expander_{i}")
-            expander.set_subtitle(f"{selected_count} sink(s) sélectionné(s)" if selected_count else "Aucun sink sélectionné")
+            apps_row = getattr(self, f"apps_row_{i}")
+            apps_row.set_text(", ".join(self._get_app_names(settings, key_suffix)))
 
             icon_row = getattr(self, f"icon_row_{i}")
             icon_row.combo_box.set_active(-1)
@@ -464,45 +1110,99 @@ class SwitchAudioAction(ActionBase):
 
         self._loading_config = False
 
-    def on_sink_toggle(self, check_button, index):
+    def on_device_toggle(self, check_button, index, kind):
         if getattr(self, '_loading_config', False):
             return
         key_suffix = ["a", "b", "c"][index]
-        # Build the list of selected sinks from all checkbuttons for this slot
-        selected_sinks = []
-        for check in self._sink_checkbuttons[index]:
+        # Build the list of selected devices from all checkbuttons for this slot
+        selected_devices = []
+        for check in self._device_checkbuttons[(kind, index)]:
             if check.get_active():
-                selected_sinks.append(check.sink_name)
+                selected_devices.append(check.device_name)
 
-        settings = self.get_settings()
-        settings[f"sink_{key_suffix}"] = selected_sinks
-        self.set_settings(settings)
+        self.queue_settings_change({f"{kind}_{key_suffix}": selected_devices})
 
         # Update expander subtitle
-        expander = getattr(self, f"sink_expander_{index}")
-        count = len(selected_sinks)
-        expander.set_subtitle(f"{count} sink(s) sélectionné(s)" if count else "Aucun sink sélectionné")
+        expander = getattr(self, f"{kind}_expander_{index}")
+        expander.set_subtitle(self._get_selection_subtitle(kind, len(selected_devices)))
 
-        self.show_state()
+    def _get_selection_subtitle(self, kind, count):
+        if kind == "source":
+            return f"{count} source(s) sélectionnée(s)" if count else "Aucune source sélectionnée"
+        return f"{count} sink(s) sélectionné(s)" if count else "Aucun sink sélectionné"
+
+    def on_apps_apply(self, entry_row, index):
+        key_suffix = ["a", "b", "c"][index]
+        app_names = [name.strip() for name in entry_row.get_text().split(",") if name.strip()]
+        self.queue_settings_change({f"apps_{key_suffix}": app_names}, refresh=False)
 
     def on_icon_change(self, combo_box, index):
+        if getattr(self, '_loading_config', False):
+            return
         key_suffix = ["a", "b", "c"][index]
         icon_row = getattr(self, f"icon_row_{index}")
         idx = icon_row.combo_box.get_active()
         if idx >= 0 and idx < len(self.icon_display_model):
             icon_name = self.icon_display_model[idx][0]
-            settings = self.get_settings()
-            settings[f"icon_{key_suffix}"] = icon_name
-            self.set_settings(settings)
-            self.show_state()
+            self.queue_settings_change({f"icon_{key_suffix}": icon_name})
+
+    def on_kind_change(self, combo_box):
+        if getattr(self, '_loading_config', False):
+            return
+        idx = self.kind_row.combo_box.get_active()
+        if idx >= 0 and idx < len(self.kind_model):
+            self.queue_settings_change({"device_kind": self.kind_model[idx][0]})
+
+    def on_gesture_change(self, combo_box, setting):
+        if getattr(self, '_loading_config', False):
+            return
+        idx = self.gesture_rows[setting].combo_box.get_active()
+        if idx >= 0 and idx < len(self.gesture_model):
+            self.queue_settings_change({setting: self.gesture_model[idx][0]}, refresh=False)
 
     def on_color_change(self, combo_box):
+        if getattr(self, '_loading_config', False):
+            return
         idx = self.color_row.combo_box.get_active()
         if idx >= 0 and idx < len(self.color_display_model):
             color = self.color_display_model[idx][0].lower()
+            self.queue_settings_change({"icon_color": color})
+
+    def queue_settings_change(self, changes, refresh=True):
+        """
+        Collect config edits and write them once the pane has been idle.
+
+        Every new edit restarts the SETTINGS_FLUSH_DELAY window, so a series
+        of toggles costs a single set_settings() and a single refresh.
+        """
+        with self._settings_lock:
+            self._pending_settings.update(changes)
+            self._pending_settings_refresh = self._pending_settings_refresh or refresh
+            if self._settings_timer is not None:
+                self._settings_timer.cancel()
+            self._settings_timer = threading.Timer(self.SETTINGS_FLUSH_DELAY, self.flush_settings)
+            self._settings_timer.daemon = True
+            self._settings_timer.start()
+
+    def flush_settings(self, refresh=True):
+        """Write pending config edits now, e.g. when the config pane closes"""
+        with self._settings_write_lock:
+            with self._settings_lock:
+                if self._settings_timer is not None:
+                    self._settings_timer.cancel()
+                    self._settings_timer = None
+                changes = self._pending_settings
+                refresh = refresh and self._pending_settings_refresh
+                self._pending_settings = {}
+                self._pending_settings_refresh = False
+
+            if not changes:
+                return
+            # Read-modify-write under the lock, so concurrent flushes cannot drop each other's edits
             settings = self.get_settings()
-            settings["icon_color"] = color
+            settings.update(changes)
             self.set_settings(settings)
+        if refresh:
             self.show_state()
 
     def on_tick(self):
@@ -513,69 +1213,123 @@ class SwitchAudioAction(ActionBase):
             log.debug("Fallback tick refresh")
             self.show_state()
 
-    def get_active_sink_index(self) -> int:
+    def get_active_slot_index(self, kind="sink") -> int:
         settings = self.get_settings()
-        current_default = self.get_default_sink_name()
+        current_default = self.get_default_device_name(kind)
         if not current_default:
             return -1
         current_default = current_default.strip()
         for i, key_suffix in enumerate(["a", "b", "c"]):
-            sink_names = self._get_sink_names(settings, key_suffix)
-            if any(name.strip() == current_default for name in sink_names):
+            device_names = self._get_device_names(settings, kind, key_suffix)
+            if any(self._target_matches_device(kind, name.strip(), current_default) for name in device_names):
                 return i
         return -1
 
     def on_key_down(self):
-        # Record press time for long press detection
-        self.key_press_time = time.time()
+        # Double press detection would turn two quick presses into one action
+        self.gestures.double_press_enabled = self.get_settings().get("double_press_action", "previous") != "none"
+        self.gestures.press()
 
     def on_key_up(self):
-        # Calculate press duration
-        if self.key_press_time is None:
-            press_duration = 0
-        else:
-            press_duration = time.time() - self.key_press_time
-            self.key_press_time = None
+        # Short press cycles to the next device, long/double press are configurable
+        self.gestures.release()
+
+    def perform_gesture(self, action_id, undo_short_press=False):
+        """
+        Run a long/double press action.
+
+        A double press follows a short press that already cycled to the next
+        device, undo_short_press accounts for it.
 
-        # Long press (>= 0.5s): just refresh display
-        if press_duration >= 0.5:
+        Returns:
+            bool: True if the action repeats while the key is held
+        """
+        step = {"previous": -1, "next": 1}.get(action_id, 0)
+        if undo_short_press:
+            step -= 1
+
+        if step:
+            self.cycle_device(step)
+        elif action_id == "refresh":
             log.info("Long press detected - refreshing display")
             self.show_state()
-            return
 
-        # Short press: cycle to next sink
+        if action_id in ("volume_up", "volume_down"):
+            delta = self.VOLUME_STEP if action_id == "volume_up" else -self.VOLUME_STEP
+            self.change_volume(delta)
+
+        return self.GESTURE_ACTIONS.get(action_id, ("", False))[1]
+
+    def cycle_device(self, step):
+        """Switch to the next (step=1) or previous (step=-1) available device"""
         settings = self.get_settings()
-        available_sinks = self.get_available_sinks()
+        kind = self._get_device_kind(settings)
+        available_devices = self.get_available_devices(kind)
 
-        # Build list of configured and available sinks with their indices
+        # Build list of configured and available devices with their indices
         available_configs = []
         for i, key_suffix in enumerate(["a", "b", "c"]):
-            sink_names = self._get_sink_names(settings, key_suffix)
-            first_available = self._get_first_available_sink(sink_names, available_sinks)
+            device_names = self._get_device_names(settings, kind, key_suffix)
+            first_available = self._get_first_available_device(device_names, available_devices)
             if first_available:
                 available_configs.append((i, first_available))
 
         if not available_configs:
-            log.warning("No available sinks configured for cycling")
+            log.warning(f"No available {kind}s configured for cycling")
             self.show_error(1)
             self.show_state()
             return
 
-        # Find current active sink in available configs
-        current_index = self.get_active_sink_index()
+        # Find current active device in available configs
+        current_index = self.get_active_slot_index(kind)
         current_position = -1
         for pos, (idx, _) in enumerate(available_configs):
             if idx == current_index:
                 current_position = pos
                 break
 
-        # Cycle to next available sink
-        next_position = (current_position + 1) % len(available_configs)
-        next_sink = available_configs[next_position][1]
+        # Cycle to next available device
+        if current_position == -1:
+            next_position = 0 if step > 0 else len(available_configs) - 1
+        else:
+            next_position = (current_position + step) % len(available_configs)
+        next_index, next_device = available_configs[next_position]
 
-        self.set_sink(next_sink)
+        self._switch_slot(settings, kind, next_index, next_device, available_devices)
+        self.show_state()
+
+    def select_slot(self, index):
+        """Switch to a given slot if its device is available"""
+        settings = self.get_settings()
+        kind = self._get_device_kind(settings)
+        available_devices = self.get_available_devices(kind)
+        device_names = self._get_device_names(settings, kind, ["a", "b", "c"][index])
+        target = self._get_first_available_device(device_names, available_devices)
+        if not target:
+            log.warning(f"Slot {['A', 'B', 'C'][index]} has no available {kind}")
+            self.show_error(1)
+            return
+        self._switch_slot(settings, kind, index, target, available_devices)
         self.show_state()
 
+    def _switch_slot(self, settings, kind, index, target, available_devices):
+        """
+        Make target the default device, then the slot's linked device.
+
+        A slot listing both outputs and inputs (e.g. a headset) switches
+        both. The linked kind is only queried when the slot has one.
+        """
+        self.set_default_device(kind, target, available_devices)
+
+        linked_kind = self._get_linked_kind(kind)
+        linked_names = self._get_device_names(settings, linked_kind, ["a", "b", "c"][index])
+        if not linked_names:
+            return
+        linked_available = self.get_available_devices(linked_kind)
+        linked_target = self._get_first_available_device(linked_names, linked_available)
+        if linked_target:
+            self.set_default_device(linked_kind, linked_target, linked_available)
+
     def on_dial_down(self):
         self.on_key_down()
 
@@ -590,65 +1344,259 @@ class SwitchAudioAction(ActionBase):
 
     # --- Settings Helpers ---
 
-    def _get_sink_names(self, settings, key_suffix):
-        """Normalize sink setting to a list (retro-compatible with old string format)"""
-        val = settings.get(f"sink_{key_suffix}", [])
+    def _get_device_kind(self, settings):
+        """Kind of device cycled by the key: "sink" (outputs) or "source" (inputs)"""
+        kind = settings.get("device_kind", "sink")
+        return kind if kind in self.DEVICE_KINDS else "sink"
+
+    def _get_linked_kind(self, kind):
+        return "source" if kind == "sink" else "sink"
+
+    def _get_device_names(self, settings, kind, key_suffix):
+        """Normalize sink/source setting to a list (retro-compatible with old string format)"""
+        val = settings.get(f"{kind}_{key_suffix}", [])
         if isinstance(val, str):
             return [val] if val else []
         return val if val else []
 
-    def _get_first_available_sink(self, sink_names, available_sinks):
-        """Return the first sink name from the list that is currently available, or None"""
-        for name in sink_names:
-            if name in available_sinks:
+    def _get_sink_names(self, settings, key_suffix):
+        return self._get_device_names(settings, "sink", key_suffix)
+
+    def _get_app_names(self, settings, key_suffix):
+        """Applications routed to a slot (application names or binaries)"""
+        return settings.get(f"apps_{key_suffix}", []) or []
+
+    def _get_first_available_device(self, device_names, available_devices):
+        """Return the first device name from the list that is currently available, or None"""
+        for name in device_names:
+            card_target = self._parse_card_target(name)
+            if card_target:
+                if self._is_card_target_available(*card_target):
+                    return name
+            elif name in available_devices:
+                return name
+        return None
+
+    def _target_matches_device(self, kind, target, device_name):
+        """Check whether a slot entry (device name or card target) is the given device"""
+        card_target = self._parse_card_target(target)
+        if not card_target:
+            return target == device_name
+        card_name, profile_name, _ = card_target
+        prefix = self._card_device_prefix(kind, card_name)
+        if not prefix or not device_name.startswith(prefix):
+            return False
+        card = self.get_card_index().get(card_name)
+        return card is not None and card["active_profile"] == profile_name
+
+    # --- Card Target Helpers ---
+
+    def _make_card_target(self, card_name, profile_name, port_name=None):
+        parts = [card_name, profile_name] + ([port_name] if port_name else [])
+        return self.CARD_TARGET_PREFIX + "|".join(parts)
+
+    def _parse_card_target(self, target):
+        """Return (card, profile, port) for a card target entry, or None for a plain device name"""
+        if not target.startswith(self.CARD_TARGET_PREFIX):
+            return None
+        parts = target[len(self.CARD_TARGET_PREFIX):].split("|")
+        if len(parts) < 2:
+            return None
+        return parts[0], parts[1], parts[2] if len(parts) > 2 else None
+
+    def _describe_card_target(self, target):
+        card_target = self._parse_card_target(target)
+        if not card_target:
+            return None
+        card_name, profile_name, port_name = card_target
+        description = f"{card_name} : {profile_name}"
+        return f"{description} / {port_name}" if port_name else description
+
+    def _is_card_target_available(self, card_name, profile_name, port_name):
+        card = self.get_card_index().get(card_name)
+        if card is None:
+            return False
+        profile = card["profiles"].get(profile_name)
+        if profile is None or not profile["available"]:
+            return False
+        if port_name:
+            port = card["ports"].get(port_name)
+            return port is not None and port["available"] is not False
+        return True
+
+    def _card_device_prefix(self, kind, card_name):
+        """
+        Devices of card "<api>_card.<id>" are named "<api>_output.<id>.<suffix>"
+        for sinks and "<api>_input.<id>.<suffix>" for sources.
+        """
+        api, sep, device_id = card_name.partition("_card.")
+        if not sep:
+            return None
+        direction = "output" if kind == "sink" else "input"
+        return f"{api}_{direction}.{device_id}."
+
+    def _resolve_card_device(self, kind, card_name, profile_name, available_devices):
+        """
+        Name of the sink or source a card exposes for a profile.
+
+        ALSA device names are derived from the output/input part of the
+        profile ("output:analog-stereo+input:analog-stereo"), so they can be
+        known before the profile is active. Other APIs (bluez) only get a
+        name once the device exists, so it is looked up among the available
+        devices.
+        """
+        prefix = self._card_device_prefix(kind, card_name)
+        if not prefix:
+            return None
+        direction = "output:" if kind == "sink" else "input:"
+        if prefix.startswith("alsa_"):
+            for part in profile_name.split("+"):
+                if part.startswith(direction):
+                    return prefix + part[len(direction):]
+        for name in sorted(available_devices or ()):
+            if name.startswith(prefix):
                 return name
         return None
 
+    def _switch_to_card_target(self, kind, card_name, profile_name, port_name, available_devices):
+        """
+        Activate a card profile and make its device the default in one batch.
+
+        The commands are sent back to back without re-listing anything in
+        between. If the device does not exist yet (PipeWire creates it
+        asynchronously, bluez names are not predictable) the switch is
+        completed by the next "new sink"/"new source" event, unless another
+        device is chosen first or CARD_SWITCH_TIMEOUT expires.
+        """
+        card = self.get_card_index().get(card_name)
+        if card is None:
+            log.warning(f"Card not found: {card_name}")
+            return
+
+        profile_changed = card["active_profile"] != profile_name
+        device_name = self._resolve_card_device(kind, card_name, profile_name, None if profile_changed else available_devices)
+
+        # Registered before any command: the "new" event of the device can
+        # be handled while the batch is still running. The profile may also
+        # have been changed just before, by the linked device.
+        pending = None
+        if profile_changed or not device_name:
+            pending = (card_name, profile_name, port_name, time.monotonic() + self.CARD_SWITCH_TIMEOUT)
+            self._pending_card_targets[kind] = pending
+
+        if profile_changed:
+            if not self._run_pactl_batch([["set-card-profile", card_name, profile_name]]):
+                self._drop_pending_card_target(kind, pending)
+                # The card may be left in any profile, re-read it on next use
+                with self._cards_lock:
+                    self._cards_dirty = True
+                return
+            with self._cards_lock:
+                card["active_profile"] = profile_name
+
+        if not device_name:
+            return
+        commands = [[f"set-default-{kind}", device_name]]
+        if port_name:
+            commands.append([f"set-{kind}-port", device_name, port_name])
+        if self._run_pactl_batch(commands):
+            self._drop_pending_card_target(kind, pending)
+            log.info(f"Switched card {card_name} to profile {profile_name}, default {kind}: {device_name}")
+
+    def _drop_pending_card_target(self, kind, pending):
+        """Forget a pending card switch, unless a newer switch replaced it"""
+        if pending is not None and self._pending_card_targets.get(kind) is pending:
+            self._pending_card_targets.pop(kind, None)
+
+    def _complete_card_switch(self, kind):
+        """Set the default device of a pending card switch once its device exists"""
+        pending = self._pending_card_targets.get(kind)
+        if pending is None:
+            return
+        card_name, profile_name, port_name, deadline = pending
+        if time.monotonic() > deadline:
+            log.warning(f"Card switch to {card_name} ({profile_name}) timed out, no {kind} appeared")
+            self._drop_pending_card_target(kind, pending)
+            return
+        device_name = self._resolve_card_device(kind, card_name, profile_name, self.get_available_devices(kind))
+        if not device_name:
+            return
+        self._drop_pending_card_target(kind, pending)
+        commands = [[f"set-default-{kind}", device_name]]
+        if port_name:
+            commands.append([f"set-{kind}-port", device_name, port_name])
+        if self._run_pactl_batch(commands):
+            log.info(f"Completed card switch to {card_name} ({profile_name}), default {kind}: {device_name}")
+
+    def get_card_index(self):
+        """Return the card index, re-reading pactl only after a card event"""
+        with self._cards_lock:
+            if not self._cards_dirty:
+                return self._cards
+            self._cards_dirty = False
+
+        cards = self.get_cards()
+        with self._cards_lock:
+            self._cards = {card["name"]: card for card in cards}
+            return self._cards
+
     # --- Backend Helpers (pactl) ---
 
-    def get_available_sinks(self):
+    def _pactl_output(self, args):
+        """Run a pactl query with a stable locale and return its output"""
+        env = os.environ.copy()
+        env["LC_ALL"] = "C"
+        return subprocess.check_output(["pactl", *args], text=True, env=env)
+
+    def _run_pactl(self, args):
+        """Run a pactl command with a stable locale, raising CalledProcessError on failure"""
+        env = os.environ.copy()
+        env["LC_ALL"] = "C"
+        subprocess.run(["pactl", *args], check=True, env=env, capture_output=True)
+
+    def _is_monitor(self, kind, name):
+        """Monitor sources mirror a sink, they are not inputs"""
+        return kind == "source" and name.endswith(".monitor")
+
+    def get_available_devices(self, kind):
         """
-        Get set of currently available audio sink names.
+        Get set of currently available audio sink or source names.
 
         Returns:
-            set: Set of sink names that are currently connected and available
+            set: Set of device names that are currently connected and available
         """
         try:
-            env = os.environ.copy()
-            env["LC_ALL"] = "C"
-            output = subprocess.check_output(["pactl", "list", "sinks", "short"], text=True, env=env)
+            output = self._pactl_output(["list", f"{kind}s", "short"])
 
-            available_sinks = set()
+            available_devices = set()
             for line in output.splitlines():
                 line = line.strip()
                 if line:
                     # Format: <id>\t<name>\t<module>\t<sample_spec>\t<state>
                     parts = line.split('\t')
-                    if len(parts) >= 2:
-                        sink_name = parts[1]
-                        available_sinks.add(sink_name)
+                    if len(parts) >= 2 and not self._is_monitor(kind, parts[1]):
+                        available_devices.add(parts[1])
 
-            log.info(f"Available sinks: {list(available_sinks)}")
-            return available_sinks
+            log.info(f"Available {kind}s: {list(available_devices)}")
+            return available_devices
         except Exception as e:
-            log.error(f"Error getting available sinks: {e}")
+            log.error(f"Error getting available {kind}s: {e}")
             return set()
 
-    def get_default_sink_name(self):
+    def get_available_sinks(self):
+        return self.get_available_devices("sink")
+
+    def get_default_device_name(self, kind):
         try:
-            env = os.environ.copy()
-            env["LC_ALL"] = "C"
-            output = subprocess.check_output(["pactl", "get-default-sink"], text=True, env=env)
+            output = self._pactl_output([f"get-default-{kind}"])
             return output.strip()
         except Exception as e:
-            log.error(f"Error getting default sink name: {e}")
+            log.error(f"Error getting default {kind} name: {e}")
             return None
 
-    def get_volume(self):
+    def get_volume(self, kind="sink"):
         try:
-            env = os.environ.copy()
-            env["LC_ALL"] = "C"
-            output = subprocess.check_output(["pactl", "get-sink-volume", "@DEFAULT_SINK@"], text=True, env=env)
+            output = self._pactl_output([f"get-{kind}-volume", f"@DEFAULT_{kind.upper()}@"])
             if "/" in output:
                 parts = output.split("/")
                 if len(parts) > 1:
@@ -659,39 +1607,171 @@ class SwitchAudioAction(ActionBase):
             log.error(f"Error getting volume: {e}")
             return "??"
 
-    def get_sinks(self):
+    def get_devices(self, kind):
         try:
-            env = os.environ.copy()
-            env["LC_ALL"] = "C"
-            output = subprocess.check_output(["pactl", "list", "sinks"], text=True, env=env)
+            output = self._pactl_output(["list", f"{kind}s"])
             
-            sinks = []
-            current_sink = {}
+            devices = []
+            current_device = {}
+            header = f"{kind.capitalize()} #"
             
             for line in output.splitlines():
                 line = line.strip()
-                if line.startswith("Sink #"):
-                    if current_sink:
-                        sinks.append(current_sink)
-                    current_sink = {}
+                if line.startswith(header):
+                    if current_device:
+                        devices.append(current_device)
+                    current_device = {}
                 elif line.startswith("Name: "):
-                    current_sink["name"] = line.split("Name: ", 1)[1]
+                    current_device["name"] = line.split("Name: ", 1)[1]
                 elif line.startswith("Description: "):
-                    current_sink["description"] = line.split("Description: ", 1)[1]
+                    current_device["description"] = line.split("Description: ", 1)[1]
             
-            if current_sink:
-                sinks.append(current_sink)
+            if current_device:
+                devices.append(current_device)
                 
-            return sinks
+            return [device for device in devices if not self._is_monitor(kind, device.get("name", ""))]
         except Exception as e:
-            log.error(f"Error getting sinks: {e}")
+            log.error(f"Error getting {kind}s: {e}")
             return []
 
-    def set_sink(self, sink_name):
+    def get_sink_inputs(self):
+        """
+        Parse "pactl list sink-inputs" into the fields used for routing.
+
+        Returns:
+            list: Streams as {"index", "application", "binary"}
+        """
         try:
-            env = os.environ.copy()
-            env["LC_ALL"] = "C"
-            subprocess.run(["pactl", "set-default-sink", str(sink_name)], check=True, env=env)
-            log.info(f"Set default sink to: {sink_name}")
+            output = self._pactl_output(["list", "sink-inputs"])
+        except Exception as e:
+            log.error(f"Error getting sink inputs: {e}")
+            return []
+
+        streams = []
+        current_stream = None
+        for line in output.splitlines():
+            line = line.strip()
+            if line.startswith("Sink Input #"):
+                current_stream = {"index": int(line[len("Sink Input #"):]), "application": None, "binary": None}
+                streams.append(current_stream)
+            elif current_stream is None:
+                continue
+            elif line.startswith("application.name = "):
+                current_stream["application"] = line.split(" = ", 1)[1].strip('"')
+            elif line.startswith("application.process.binary = "):
+                current_stream["binary"] = os.path.basename(line.split(" = ", 1)[1].strip('"'))
+        return streams
+
+    def get_cards(self):
+        """
+        Parse "pactl list cards" into card dicts with their profiles and ports.
+
+        Returns:
+            list: Cards as {"index", "name", "description", "active_profile",
+                  "profiles": {name: {...}}, "ports": {name: {...}}}
+        """
+        try:
+            output = self._pactl_output(["list", "cards"])
+        except Exception as e:
+            log.error(f"Error getting cards: {e}")
+            with self._cards_lock:
+                self._cards_dirty = True
+            return []
+
+        profile_pattern = re.compile(r"^(.+?): (.*) \(sinks: (\d+), sources: (\d+), priority: \d+, available: (yes|no)\)$")
+        port_pattern = re.compile(r"^(\S+): (.*) \(([^()]*)\)$")
+
+        cards = []
+        card = None
+        section = None
+        port = None
+        for raw_line in output.splitlines():
+            depth = len(raw_line) - len(raw_line.lstrip("\t"))
+            line = raw_line.strip()
+            if raw_line.startswith("Card #"):
+                card = {
+                    "index": int(line[len("Card #"):]),
+                    "name": None,
+                    "description": None,
+                    "active_profile": None,
+                    "profiles": {},
+                    "ports": {},
+                }
+                cards.append(card)
+                section = None
+            elif card is None or not line:
+                continue
+            elif depth == 1:
+                section = None
+                if line.startswith("Name: "):
+                    card["name"] = line.split("Name: ", 1)[1]
+                elif line.startswith("Active Profile: "):
+                    card["active_profile"] = line.split("Active Profile: ", 1)[1]
+                elif line.endswith(":"):
+                    section = line[:-1]
+            elif section == "Properties" and line.startswith("device.description = "):
+                card["description"] = line.split(" = ", 1)[1].strip('"')
+            elif section == "Profiles" and depth == 2:
+                match = profile_pattern.match(line)
+                if match:
+                    card["profiles"][match.group(1)] = {
+                        "description": match.group(2),
+                        "sinks": int(match.group(3)),
+                        "sources": int(match.group(4)),
+                        "available": match.group(5) == "yes",
+                    }
+            elif section == "Ports" and depth == 2:
+                match = port_pattern.match(line)
+                port = None
+                if match:
+                    availability = match.group(3).split(", ")[-1]
+                    port = {
+                        "description": match.group(2),
+                        "available": {"available": True, "not available": False}.get(availability),
+                        "profiles": [],
+                    }
+                    card["ports"][match.group(1)] = port
+            elif section == "Ports" and port is not None and line.startswith("Part of profile(s): "):
+                port["profiles"] = line.split(": ", 1)[1].split(", ")
+
+        for card in cards:
+            if not card["description"]:
+                card["description"] = card["name"]
+        return [card for card in cards if card["name"]]
+
+    def _run_pactl_batch(self, commands):
+        """Run pactl commands back to back, stopping at the first failure"""
+        for command in commands:
+            try:
+                self._run_pactl(command)
+            except (subprocess.CalledProcessError, OSError) as e:
+                log.error(f"Error running pactl {' '.join(command)}: {e}")
+                return False
+        return True
+
+    def change_volume(self, delta):
+        """Change the volume of the default device cycled by the key by delta percent, up to MAX_VOLUME"""
+        kind = self._get_device_kind(self.get_settings())
+        if delta > 0:
+            # pactl happily amplifies past 100%, and the gesture repeats while held
+            volume = self.get_volume(kind)
+            if not volume.isdigit():
+                log.warning(f"Not raising the {kind} volume, current volume unknown")
+                return
+            delta = min(delta, self.MAX_VOLUME - int(volume))
+            if delta <= 0:
+                return
+        self._run_pactl_batch([[f"set-{kind}-volume", f"@DEFAULT_{kind.upper()}@", f"{delta:+d}%"]])
+
+    def set_default_device(self, kind, device_name, available_devices=None):
+        # A newer choice always wins over a card switch still waiting for its device
+        self._pending_card_targets.pop(kind, None)
+        card_target = self._parse_card_target(device_name)
+        if card_target:
+            self._switch_to_card_target(kind, *card_target, available_devices)
+            return
+        try:
+            self._run_pactl([f"set-default-{kind}", str(device_name)])
+            log.info(f"Set default {kind} to: {device_name}")
         except subprocess.CalledProcessError as e:
-            log.error(f"Error setting sink: {e}")
+            log.error(f"Error setting {kind}: {e}")
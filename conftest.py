@@ -0,0 +1,61 @@
+"""
+Shared test helpers: pactl snapshot builders, a throwaway plugin directory
+and a factory for headless actions talking to a fake pactl backend.
+"""
+import pytest
+
+import event_replay
+
+SPEAKERS = "alsa_output.pci-0000_00_1f.3.analog-stereo"
+HEADPHONES = "alsa_output.usb-Audiophonics_SA9023-00.analog-stereo"
+
+
+def short_listing(names, first_index=56):
+    """Output of "pactl list sinks short" (or sources) for the given device names"""
+    return "".join(
+        f"{first_index + i}\t{name}\tPipeWire\ts32le 2ch 48000Hz\tSUSPENDED\n" for i, name in enumerate(names)
+    )
+
+
+def volume_output(percent="50"):
+    """Output of "pactl get-sink-volume" (or get-source-volume)"""
+    return f"Volume: front-left: 32768 / {percent:>3}% / -18.06 dB,   front-right: 32768 / {percent:>3}% / -18.06 dB\n"
+
+
+def make_snapshot(t, default_sink, sinks=(SPEAKERS, HEADPHONES), volume="50"):
+    """The queries of a sink refresh, as recorded at time t"""
+    return [
+        {"t": t, "kind": "query", "args": ["list", "sinks", "short"], "output": short_listing(sinks)},
+        {"t": t, "kind": "query", "args": ["get-default-sink"], "output": default_sink + "\n"},
+        {"t": t, "kind": "query", "args": ["get-sink-volume", "@DEFAULT_SINK@"], "output": volume_output(volume)},
+        {"t": t, "kind": "query", "args": ["list", "cards"], "output": ""},
+    ]
+
+
+@pytest.fixture
+def plugin_path():
+    with event_replay.plugin_directory() as path:
+        yield path
+
+
+@pytest.fixture
+def make_action(plugin_path):
+    """
+    Build headless actions in plugin_path.
+
+    The factory takes a recording (or a FakePactlBackend) and settings. The
+    action keeps what it draws in .drawn and its labels in .labels, and its
+    fake backend in .backend.
+    """
+    def make(recording_or_backend, settings=None):
+        backend = recording_or_backend
+        if not isinstance(backend, event_replay.FakePactlBackend):
+            backend = event_replay.FakePactlBackend(recording_or_backend)
+        action = event_replay.make_action(event_replay.load_action_class(), plugin_path, backend, settings)
+        action.backend = backend
+        action.drawn = []
+        action.labels = []
+        action.set_media = lambda image=None, **kwargs: action.drawn.append(image)
+        action.set_bottom_label = lambda label, **kwargs: action.labels.append(label)
+        return action
+    return make
@@ -0,0 +1,463 @@
+"""
+Record pactl event streams and replay them through SwitchAudioAction.
+
+Recording captures the timestamped output of "pactl subscribe" together
+with the results of the queries the action runs (SNAPSHOT_QUERIES), taken
+after each burst of events. Replaying feeds the events through the action
+at real or accelerated speed, answering its queries from the recording,
+and reports how many refreshes, backend calls and renders it took and how
+stale the display got.
+
+Replays are not deterministic: the action's refresh and routing timers
+are real threading.Timer objects and events are paced on the wall clock,
+so a burst can land on either side of a coalescing window. Counts vary
+slightly between runs of the same recording (e.g. 10 or 11 refreshes);
+the --max-* thresholds and the tests' bounds leave room for that.
+
+Usage:
+    python event_replay.py record storm.jsonl --duration 60
+    python event_replay.py replay storm.jsonl --speed 10 --max-refreshes 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter
+from unittest.mock import MagicMock
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Queries the action answers its refreshes and switches with
+SNAPSHOT_QUERIES = [
+    ["list", "sinks", "short"],
+    ["get-default-sink"],
+    ["get-sink-volume", "@DEFAULT_SINK@"],
+    ["list", "sinks"],
+    ["list", "sources", "short"],
+    ["get-default-source"],
+    ["get-source-volume", "@DEFAULT_SOURCE@"],
+    ["list", "sources"],
+    ["list", "cards"],
+    ["list", "sink-inputs"],
+]
+
+# Minimum time between two snapshots while recording a burst
+SNAPSHOT_INTERVAL = 0.05
+
+# Facilities the action reacts to. Others, "client" in particular, are only
+# recorded: the snapshot's own pactl processes emit client events, which
+# would otherwise request snapshots forever.
+SNAPSHOT_FACILITIES = {"sink", "source", "sink-input", "source-output", "card", "server"}
+EVENT_PATTERN = re.compile(r"^Event '(\w+)' on ([\w-]+) #(-?\d+)$")
+
+
+def wants_snapshot(line):
+    """Whether a pactl subscribe line can change what the action displays"""
+    match = EVENT_PATTERN.match(line)
+    return bool(match) and match.group(2) in SNAPSHOT_FACILITIES
+
+
+def _pactl_env():
+    env = os.environ.copy()
+    env["LC_ALL"] = "C"
+    return env
+
+
+# --- Recording ---
+
+class EventRecorder:
+    """Write pactl subscribe lines and snapshot query results to a JSON lines file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.start_time = None
+        self._file = None
+        self._write_lock = threading.Lock()
+        self._snapshot_wanted = threading.Event()
+        self._running = False
+
+    def record(self, duration=None):
+        self.start_time = time.monotonic()
+        self._running = True
+        process = subprocess.Popen(
+            ["pactl", "subscribe"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=_pactl_env(),
+            bufsize=1
+        )
+        stop_timer = None
+        if duration:
+            stop_timer = threading.Timer(duration, process.terminate)
+            stop_timer.daemon = True
+            stop_timer.start()
+
+        with open(self.path, "w") as self._file:
+            snapshot_thread = threading.Thread(target=self._snapshot_worker, daemon=True)
+            snapshot_thread.start()
+            # Initial state, so replay can answer queries before the first event
+            self._snapshot_wanted.set()
+            try:
+                for line in process.stdout:
+                    line = line.strip()
+                    if line:
+                        self._write({"kind": "event", "line": line})
+                        if wants_snapshot(line):
+                            self._snapshot_wanted.set()
+            except KeyboardInterrupt:
+                process.terminate()
+            finally:
+                if stop_timer is not None:
+                    stop_timer.cancel()
+                self._running = False
+                self._snapshot_wanted.set()
+                snapshot_thread.join(timeout=5)
+
+    def _snapshot_worker(self):
+        while self._running:
+            self._snapshot_wanted.wait()
+            self._snapshot_wanted.clear()
+            if not self._running:
+                break
+            for args in SNAPSHOT_QUERIES:
+                try:
+                    output = subprocess.check_output(["pactl", *args], text=True, env=_pactl_env())
+                except (subprocess.CalledProcessError, OSError):
+                    output = None
+                self._write({"kind": "query", "args": args, "output": output})
+            time.sleep(SNAPSHOT_INTERVAL)
+
+    def _write(self, record):
+        record["t"] = round(time.monotonic() - self.start_time, 6)
+        with self._write_lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+
+def load_recording(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- Replay ---
+
+class FakePactlBackend:
+    """Answer pactl queries from a recording, as of the current replay time"""
+
+    def __init__(self, recording):
+        self.now = 0.0
+        self.calls = Counter()
+        self.commands = []
+        # Commands (e.g. "set-card-profile") made to fail, to replay pactl errors
+        self.failing = set()
+        self._answers = {}
+        for record in recording:
+            if record["kind"] == "query":
+                key = tuple(record["args"])
+                self._answers.setdefault(key, []).append((record["t"], record["output"]))
+
+    def output(self, args):
+        key = tuple(args)
+        self.calls[" ".join(key)] += 1
+        answers = self._answers.get(key)
+        if not answers:
+            raise subprocess.CalledProcessError(1, ["pactl", *args])
+        # Latest answer recorded at or before now, else the first one
+        output = answers[0][1]
+        for t, answer in answers:
+            if t > self.now:
+                break
+            output = answer
+        if output is None:
+            raise subprocess.CalledProcessError(1, ["pactl", *args])
+        return output
+
+    def run(self, args):
+        self.calls[" ".join(args)] += 1
+        self.commands.append(list(args))
+        if args[0] in self.failing:
+            raise subprocess.CalledProcessError(1, ["pactl", *args])
+
+
+class _ReplayActionBase:
+    """Just enough of StreamController's ActionBase to drive the action headless"""
+
+    def __init__(self, *args, plugin_base=None, settings=None, **kwargs):
+        self.plugin_base = plugin_base
+        self.input_ident = kwargs.get("input_ident")
+        self._settings = dict(settings or {})
+
+    def get_settings(self):
+        return dict(self._settings)
+
+    def set_settings(self, settings):
+        self._settings = dict(settings)
+
+    def set_media(self, *args, **kwargs):
+        pass
+
+    def set_bottom_label(self, *args, **kwargs):
+        pass
+
+    def show_error(self, *args, **kwargs):
+        pass
+
+    def event_callback(self, event, data=None):
+        pass
+
+
+class _ReplayInput:
+    """Input types the action tells apart; replayed actions sit on a key"""
+
+    class Key:
+        pass
+
+    class Dial:
+        pass
+
+    class Touchscreen:
+        class Events:
+            SHORT = "short"
+            LONG = "long"
+            DRAG_LEFT = "drag-left"
+            DRAG_RIGHT = "drag-right"
+
+
+def load_action_class():
+    """Import SwitchAudioAction with StreamController and GTK replaced by stand-ins"""
+    action_base = types.ModuleType("src.backend.PluginManager.ActionBase")
+    action_base.ActionBase = _ReplayActionBase
+    input_identifier = types.ModuleType("src.backend.DeckManagement.InputIdentifier")
+    input_identifier.Input = _ReplayInput
+    stand_ins = {
+        "GtkHelper": MagicMock(),
+        "GtkHelper.GtkHelper": MagicMock(),
+        "src": MagicMock(),
+        "src.backend": MagicMock(),
+        "src.backend.PluginManager": MagicMock(),
+        "src.backend.PluginManager.ActionBase": action_base,
+        "src.backend.PluginManager.ActionInputSupport": MagicMock(),
+        "src.backend.DeckManagement": MagicMock(),
+        "src.backend.DeckManagement.DeckController": MagicMock(),
+        "src.backend.DeckManagement.InputIdentifier": input_identifier,
+        "src.backend.PageManagement": MagicMock(),
+        "src.backend.PageManagement.Page": MagicMock(),
+        "gi": MagicMock(),
+        "gi.repository": MagicMock(),
+    }
+    for name, module in stand_ins.items():
+        sys.modules.setdefault(name, module)
+    # The action must be built on our ActionBase and Input, even if something
+    # else (e.g. another test) already imported it against different ones
+    sys.modules["src.backend.PluginManager.ActionBase"] = action_base
+    sys.modules["src.backend.DeckManagement.InputIdentifier"] = input_identifier
+    loaded = sys.modules.get("actions.SwitchAudioAction")
+    action_class = getattr(loaded, "SwitchAudioAction", None)
+    if loaded is not None and not (isinstance(action_class, type) and issubclass(action_class, _ReplayActionBase)):
+        del sys.modules["actions.SwitchAudioAction"]
+
+    if PLUGIN_DIR not in sys.path:
+        sys.path.append(PLUGIN_DIR)
+    from actions.SwitchAudioAction import SwitchAudioAction
+    return SwitchAudioAction
+
+
+def default_settings(recording, kind="sink"):
+    """Use the first three recorded sinks (or sources) as slots A, B and C"""
+    for record in recording:
+        if record["kind"] == "query" and record["args"] == ["list", f"{kind}s", "short"] and record["output"]:
+            names = [
+                line.split("\t")[1] for line in record["output"].splitlines()
+                if "\t" in line and not line.split("\t")[1].endswith(".monitor")
+            ]
+            settings = {} if kind == "sink" else {"device_kind": kind}
+            for key_suffix, name in zip(["a", "b", "c"], names):
+                settings[f"{kind}_{key_suffix}"] = [name]
+            return settings
+    return {}
+
+
+@contextlib.contextmanager
+def plugin_directory():
+    """A throwaway plugin directory sharing the real assets, so nothing lands in cache/"""
+    with tempfile.TemporaryDirectory() as plugin_path:
+        os.symlink(os.path.join(PLUGIN_DIR, "assets"), os.path.join(plugin_path, "assets"))
+        yield plugin_path
+
+
+def make_action(action_class, plugin_path, backend, settings=None):
+    """A headless action talking to a fake backend, with nothing written to disk"""
+    plugin_base = types.SimpleNamespace(PATH=plugin_path)
+    action = action_class(plugin_base=plugin_base, settings=settings)
+    action.PERSIST_FRAMES = False
+    action.PERSIST_STATE = False
+    action._pactl_output = backend.output
+    action._run_pactl = backend.run
+    return action
+
+
+class ReplayHarness:
+    """Feed a recording through a headless SwitchAudioAction and measure it"""
+
+    def __init__(self, recording, speed=1.0, settings=None):
+        self.recording = recording
+        self.speed = speed
+        self.backend = FakePactlBackend(recording)
+        self.settings = settings if settings is not None else default_settings(recording)
+
+        self.refreshes = 0
+        self.renders = 0
+        self.staleness = []
+        self._unseen_events = []
+        self._stats_lock = threading.Lock()
+        self._start = None
+        self._first_t = 0.0
+
+    def run(self):
+        action_class = load_action_class()
+        with plugin_directory() as plugin_path:
+            action = self._make_action(action_class, plugin_path)
+
+            events = [record for record in self.recording if record["kind"] == "event"]
+            self._first_t = self.recording[0]["t"] if self.recording else 0.0
+            self._start = time.monotonic()
+            self._sync_backend_clock()
+            action.show_state()
+
+            for record in events:
+                delay = self._start + (record["t"] - self._first_t) / self.speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                self._sync_backend_clock()
+                arrived = time.monotonic()
+                with self._stats_lock:
+                    self._unseen_events.append(arrived)
+                if not action._handle_event_line(record["line"]):
+                    # Ignored events (client, module, other device kind) are never displayed
+                    with self._stats_lock:
+                        if arrived in self._unseen_events:
+                            self._unseen_events.remove(arrived)
+
+            # Let the trailing refresh and stream routing land
+            time.sleep(action.REFRESH_DELAY * 3 + 0.05)
+            with action._routing_lock:
+                pending_routing = action._routing_timer
+            if pending_routing is not None:
+                pending_routing.join()
+            with action._refresh_lock:
+                pending = action._refresh_timer
+            if pending is not None:
+                pending.join()
+        return self.report(len(events))
+
+    def _make_action(self, action_class, plugin_path):
+        action = make_action(action_class, plugin_path, self.backend, self.settings)
+        action.REFRESH_DELAY = action_class.REFRESH_DELAY / self.speed
+        action.ROUTING_DELAY = action_class.ROUTING_DELAY / self.speed
+
+        show_state = action.show_state
+        set_media = action.set_media
+
+        def measured_show_state():
+            self._sync_backend_clock()
+            with self._stats_lock:
+                covered = self._unseen_events
+                self._unseen_events = []
+                self.refreshes += 1
+            show_state()
+            done = time.monotonic()
+            with self._stats_lock:
+                self.staleness.extend(done - arrived for arrived in covered)
+
+        def counted_set_media(*args, **kwargs):
+            with self._stats_lock:
+                self.renders += 1
+            set_media(*args, **kwargs)
+
+        action.show_state = measured_show_state
+        action.set_media = counted_set_media
+        return action
+
+    def _sync_backend_clock(self):
+        self.backend.now = self._first_t + (time.monotonic() - self._start) * self.speed
+
+    def report(self, event_count):
+        # Staleness is reported in recording time, so speeds are comparable
+        staleness_ms = sorted(value * self.speed * 1000 for value in self.staleness)
+
+        def percentile(p):
+            if not staleness_ms:
+                return 0.0
+            return staleness_ms[min(len(staleness_ms) - 1, int(len(staleness_ms) * p))]
+
+        return {
+            "events": event_count,
+            "refreshes": self.refreshes,
+            "renders": self.renders,
+            "backend_calls": sum(self.backend.calls.values()),
+            "backend_calls_by_command": dict(self.backend.calls),
+            "unrefreshed_events": len(self._unseen_events),
+            "staleness_ms": {
+                "mean": sum(staleness_ms) / len(staleness_ms) if staleness_ms else 0.0,
+                "p95": percentile(0.95),
+                "max": staleness_ms[-1] if staleness_ms else 0.0,
+            },
+        }
+
+
+def check_report(report, max_refreshes=None, max_backend_calls=None, max_staleness_ms=None):
+    """Return the list of threshold violations for a replay report"""
+    failures = []
+    if report["unrefreshed_events"]:
+        failures.append(f"{report['unrefreshed_events']} event(s) never reached the display")
+    if max_refreshes is not None and report["refreshes"] > max_refreshes:
+        failures.append(f"refreshes: {report['refreshes']} > {max_refreshes}")
+    if max_backend_calls is not None and report["backend_calls"] > max_backend_calls:
+        failures.append(f"backend calls: {report['backend_calls']} > {max_backend_calls}")
+    if max_staleness_ms is not None and report["staleness_ms"]["max"] > max_staleness_ms:
+        failures.append(f"max staleness: {report['staleness_ms']['max']:.1f} ms > {max_staleness_ms} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay pactl event streams")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Record pactl subscribe events and snapshots")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--duration", type=float, help="Stop after this many seconds (default: Ctrl+C)")
+
+    replay_parser = subparsers.add_parser("replay", help="Replay a recording through the action")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor (default: real time)")
+    replay_parser.add_argument("--kind", choices=["sink", "source"], default="sink", help="Kind of device cycled (default: sink)")
+    replay_parser.add_argument("--max-refreshes", type=int)
+    replay_parser.add_argument("--max-backend-calls", type=int)
+    replay_parser.add_argument("--max-staleness-ms", type=float)
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        print(f"Recording pactl events to {args.path}...")
+        EventRecorder(args.path).record(duration=args.duration)
+        return 0
+
+    recording = load_recording(args.path)
+    report = ReplayHarness(recording, speed=args.speed, settings=default_settings(recording, args.kind)).run()
+    print(json.dumps(report, indent=2))
+    failures = check_report(report, args.max_refreshes, args.max_backend_calls, args.max_staleness_ms)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,32 +50,45 @@ class AudioSwitchPlugin(PluginBase):
             app_version="1.5.0"
         )
 
-    def get_sinks(self):
+    def get_devices(self, media_class):
+        """List PipeWire nodes of a media class ("Audio/Sink" or "Audio/Source")"""
         try:
             output = subprocess.check_output(["pw-dump"], text=True)
             data = json.loads(output)
-            sinks = []
+            devices = []
             for item in data:
                 props = item.get("info", {}).get("props", {})
-                if props.get("media.class") == "Audio/Sink":
-                    sinks.append({
+                if props.get("media.class") == media_class:
+                    devices.append({
                         "id": item.get("id"),
                         "name": props.get("node.name"),
                         "description": props.get("node.description"),
                         "nick": props.get("node.nick")
                     })
-            return sinks
+            return devices
         except Exception as e:
-            log.error(f"Error getting sinks: {e}")
+            log.error(f"Error getting {media_class} devices: {e}")
             return []
 
-    def set_sink(self, sink_id):
+    def get_sinks(self):
+        return self.get_devices("Audio/Sink")
+
+    def get_sources(self):
+        return self.get_devices("Audio/Source")
+
+    def set_default_device(self, device_id):
         try:
-            # sink_id can be the integer ID or the name
-            subprocess.run(["wpctl", "set-default", str(sink_id)], check=True)
-            log.info(f"Set default sink to: {sink_id}")
+            # device_id can be the integer ID or the name, wpctl handles sinks and sources alike
+            subprocess.run(["wpctl", "set-default", str(device_id)], check=True)
+            log.info(f"Set default device to: {device_id}")
         except subprocess.CalledProcessError as e:
-            log.error(f"Error setting sink: {e}")
+            log.error(f"Error setting default device: {e}")
+
+    def set_sink(self, sink_id):
+        self.set_default_device(sink_id)
+
+    def set_source(self, source_id):
+        self.set_default_device(source_id)
 
     def on_uninstall(self):
         """Clean up plugin resources on uninstall"""
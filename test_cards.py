@@ -0,0 +1,230 @@
+import time
+
+import pytest
+
+import event_replay
+from conftest import SPEAKERS, short_listing
+
+# "LC_ALL=C pactl list cards" for a GPU HDMI controller and a Bluetooth headset
+HDMI_CARD = """Card #42
+	Name: alsa_card.pci-0000_01_00.1
+	Driver: alsa
+	Owner Module: n/a
+	Properties:
+		api.acp.auto-port = "false"
+		api.alsa.card = "1"
+		api.alsa.card.name = "HDA NVidia"
+		device.api = "alsa"
+		device.bus = "pci"
+		device.description = "GA102 High Definition Audio Controller"
+		device.name = "alsa_card.pci-0000_01_00.1"
+		device.nick = "HDA NVidia"
+	Profiles:
+		off: Off (sinks: 0, sources: 0, priority: 0, available: yes)
+		output:hdmi-stereo: Digital Stereo (HDMI) Output (sinks: 1, sources: 0, priority: 5900, available: yes)
+		output:hdmi-stereo-extra1: Digital Stereo (HDMI 2) Output (sinks: 1, sources: 0, priority: 5700, available: no)
+		output:hdmi-surround: Digital Surround 5.1 (HDMI) Output (sinks: 1, sources: 0, priority: 800, available: yes)
+		pro-audio: Pro Audio (sinks: 4, sources: 0, priority: 1, available: yes)
+	Active Profile: off
+	Ports:
+		hdmi-output-0: HDMI / DisplayPort (type: HDMI, priority: 5900, latency offset: 0 usec, availability group: Legacy 1, available)
+			Properties:
+				port.type = "hdmi"
+				port.availability-group = "Legacy 1"
+				device.icon_name = "video-display"
+				card.profile.port = "0"
+			Part of profile(s): output:hdmi-stereo, output:hdmi-surround
+		hdmi-output-1: HDMI / DisplayPort 2 (type: HDMI, priority: 5800, latency offset: 0 usec, availability group: Legacy 2, not available)
+			Properties:
+				port.type = "hdmi"
+				port.availability-group = "Legacy 2"
+				device.icon_name = "video-display"
+				card.profile.port = "1"
+			Part of profile(s): output:hdmi-stereo-extra1
+"""
+
+BLUEZ_CARD = """Card #85
+	Name: bluez_card.AC_80_0A_11_22_33
+	Driver: module-bluez5-device.c
+	Owner Module: n/a
+	Properties:
+		api.bluez5.address = "AC:80:0A:11:22:33"
+		api.bluez5.class = "0x240404"
+		device.api = "bluez5"
+		device.bus = "bluetooth"
+		device.description = "WH-1000XM4"
+		device.form_factor = "headset"
+		device.name = "bluez_card.AC_80_0A_11_22_33"
+	Profiles:
+		off: Off (sinks: 0, sources: 0, priority: 0, available: yes)
+		a2dp-sink-sbc: High Fidelity Playback (A2DP Sink, codec SBC) (sinks: 1, sources: 0, priority: 18, available: yes)
+		a2dp-sink: High Fidelity Playback (A2DP Sink, codec LDAC) (sinks: 1, sources: 0, priority: 19, available: yes)
+		headset-head-unit-cvsd: Headset Head Unit (HSP/HFP, codec CVSD) (sinks: 1, sources: 1, priority: 1, available: yes)
+		headset-head-unit: Headset Head Unit (HSP/HFP, codec mSBC) (sinks: 1, sources: 1, priority: 2, available: yes)
+	Active Profile: a2dp-sink
+	Ports:
+		headphone-input: Handsfree (type: Headset, priority: 0, latency offset: 0 usec, availability group: , available)
+			Properties:
+				port.type = "headset"
+			Part of profile(s): headset-head-unit, headset-head-unit-cvsd
+		headphone-output: Headphone (type: Headphones, priority: 0, latency offset: 0 usec, availability group: , available)
+			Properties:
+				port.type = "headphones"
+			Part of profile(s): a2dp-sink, a2dp-sink-sbc, headset-head-unit, headset-head-unit-cvsd
+"""
+
+HDMI_SINK = "alsa_output.pci-0000_01_00.1.hdmi-stereo"
+BLUEZ_SINK = "bluez_output.AC_80_0A_11_22_33.1"
+
+
+def make_recording(sinks_before, sinks_after=None):
+    """Card listings at t=0, sink listings before (t=0) and after (t=1) the switch"""
+    recording = [
+        {"t": 0.0, "kind": "query", "args": ["list", "cards"], "output": HDMI_CARD + "\n" + BLUEZ_CARD},
+        {"t": 0.0, "kind": "query", "args": ["list", "sinks", "short"], "output": short_listing(sinks_before)},
+    ]
+    if sinks_after is not None:
+        recording.append({"t": 1.0, "kind": "query", "args": ["list", "sinks", "short"], "output": short_listing(sinks_after)})
+    return recording
+
+
+@pytest.fixture
+def make_card_action(make_action):
+    def make(backend):
+        action = make_action(backend)
+        # Display refreshes are covered by the replay tests
+        action._schedule_refresh = lambda: None
+        return action
+    return make
+
+
+def test_parses_alsa_hdmi_card(make_card_action):
+    action = make_card_action(event_replay.FakePactlBackend(make_recording([SPEAKERS])))
+    card = action.get_card_index()["alsa_card.pci-0000_01_00.1"]
+
+    assert card["index"] == 42
+    assert card["description"] == "GA102 High Definition Audio Controller"
+    assert card["active_profile"] == "off"
+    assert card["profiles"]["output:hdmi-stereo"] == {
+        "description": "Digital Stereo (HDMI) Output", "sinks": 1, "sources": 0, "available": True,
+    }
+    assert card["profiles"]["output:hdmi-stereo-extra1"]["available"] is False
+    assert card["profiles"]["pro-audio"]["sinks"] == 4
+    assert card["ports"]["hdmi-output-0"] == {
+        "description": "HDMI / DisplayPort",
+        "available": True,
+        "profiles": ["output:hdmi-stereo", "output:hdmi-surround"],
+    }
+    assert card["ports"]["hdmi-output-1"]["available"] is False
+
+
+def test_parses_bluez_card(make_card_action):
+    action = make_card_action(event_replay.FakePactlBackend(make_recording([SPEAKERS])))
+    card = action.get_card_index()["bluez_card.AC_80_0A_11_22_33"]
+
+    assert card["index"] == 85
+    assert card["description"] == "WH-1000XM4"
+    assert card["active_profile"] == "a2dp-sink"
+    assert card["profiles"]["a2dp-sink"]["description"] == "High Fidelity Playback (A2DP Sink, codec LDAC)"
+    assert card["profiles"]["headset-head-unit"]["sources"] == 1
+    assert card["ports"]["headphone-input"]["profiles"] == ["headset-head-unit", "headset-head-unit-cvsd"]
+    assert card["ports"]["headphone-output"]["available"] is True
+
+
+def test_card_targets_per_kind(make_card_action):
+    action = make_card_action(event_replay.FakePactlBackend(make_recording([SPEAKERS])))
+    sink_targets = {target: available for target, _, available in action._get_card_targets("sink")}
+    source_targets = {target: available for target, _, available in action._get_card_targets("source")}
+
+    assert sink_targets["card|alsa_card.pci-0000_01_00.1|output:hdmi-stereo"] is True
+    assert sink_targets["card|alsa_card.pci-0000_01_00.1|output:hdmi-stereo-extra1"] is False
+    assert "card|alsa_card.pci-0000_01_00.1|off" not in sink_targets
+    assert set(source_targets) == {
+        "card|bluez_card.AC_80_0A_11_22_33|headset-head-unit",
+        "card|bluez_card.AC_80_0A_11_22_33|headset-head-unit-cvsd",
+    }
+
+
+def test_alsa_switch_sets_profile_and_predicted_sink(make_card_action):
+    backend = event_replay.FakePactlBackend(make_recording([SPEAKERS]))
+    action = make_card_action(backend)
+    action.set_default_device("sink", "card|alsa_card.pci-0000_01_00.1|output:hdmi-stereo")
+
+    assert backend.commands == [
+        ["set-card-profile", "alsa_card.pci-0000_01_00.1", "output:hdmi-stereo"],
+        ["set-default-sink", HDMI_SINK],
+    ]
+    assert action.get_card_index()["alsa_card.pci-0000_01_00.1"]["active_profile"] == "output:hdmi-stereo"
+    assert action._pending_card_targets == {}
+
+
+def test_bluez_switch_completes_when_the_sink_appears(make_card_action):
+    backend = event_replay.FakePactlBackend(make_recording([SPEAKERS], [SPEAKERS, BLUEZ_SINK]))
+    action = make_card_action(backend)
+    action.set_default_device("sink", "card|bluez_card.AC_80_0A_11_22_33|headset-head-unit")
+
+    # The bluez sink name is unknown until it exists
+    assert backend.commands == [["set-card-profile", "bluez_card.AC_80_0A_11_22_33", "headset-head-unit"]]
+    assert "sink" in action._pending_card_targets
+
+    backend.now = 1.0
+    action._handle_event_line("Event 'new' on sink #90")
+    assert backend.commands[-1] == ["set-default-sink", BLUEZ_SINK]
+    assert action._pending_card_targets == {}
+
+
+def test_failed_default_stays_pending_until_the_sink_appears(make_card_action):
+    backend = event_replay.FakePactlBackend(make_recording([SPEAKERS], [SPEAKERS, HDMI_SINK]))
+    backend.failing = {"set-default-sink"}
+    action = make_card_action(backend)
+    action.set_default_device("sink", "card|alsa_card.pci-0000_01_00.1|output:hdmi-stereo")
+    assert "sink" in action._pending_card_targets
+
+    backend.failing = set()
+    backend.now = 1.0
+    action._handle_event_line("Event 'new' on sink #90")
+    assert backend.commands[-1] == ["set-default-sink", HDMI_SINK]
+    assert action._pending_card_targets == {}
+
+
+def test_later_plain_switch_cancels_pending_card_switch(make_card_action):
+    backend = event_replay.FakePactlBackend(make_recording([SPEAKERS], [SPEAKERS, HDMI_SINK]))
+    backend.failing = {"set-default-sink"}
+    action = make_card_action(backend)
+    action.set_default_device("sink", "card|alsa_card.pci-0000_01_00.1|output:hdmi-stereo")
+
+    backend.failing = set()
+    action.set_default_device("sink", SPEAKERS)
+    backend.now = 1.0
+    action._handle_event_line("Event 'new' on sink #90")
+
+    # The user's later choice is not overridden
+    assert backend.commands[-1] == ["set-default-sink", SPEAKERS]
+
+
+def test_pending_card_switch_expires(make_card_action):
+    backend = event_replay.FakePactlBackend(make_recording([SPEAKERS], [SPEAKERS, BLUEZ_SINK]))
+    action = make_card_action(backend)
+    action.CARD_SWITCH_TIMEOUT = 0.01
+    action.set_default_device("sink", "card|bluez_card.AC_80_0A_11_22_33|headset-head-unit")
+
+    time.sleep(0.02)
+    backend.now = 1.0
+    action._handle_event_line("Event 'new' on sink #90")
+    assert backend.commands == [["set-card-profile", "bluez_card.AC_80_0A_11_22_33", "headset-head-unit"]]
+    assert action._pending_card_targets == {}
+
+
+def test_failed_profile_switch_keeps_the_index_honest(make_card_action):
+    backend = event_replay.FakePactlBackend(make_recording([SPEAKERS]))
+    backend.failing = {"set-card-profile"}
+    action = make_card_action(backend)
+    action.set_default_device("sink", "card|alsa_card.pci-0000_01_00.1|output:hdmi-stereo")
+
+    # No default change for a profile that did not activate, nothing left pending
+    assert backend.commands == [["set-card-profile", "alsa_card.pci-0000_01_00.1", "output:hdmi-stereo"]]
+    assert action._pending_card_targets == {}
+    # The index is re-read instead of trusting the requested profile
+    assert action.get_card_index()["alsa_card.pci-0000_01_00.1"]["active_profile"] == "off"
+    assert backend.calls["list cards"] == 2
+    assert not action._target_matches_device("sink", "card|alsa_card.pci-0000_01_00.1|output:hdmi-stereo", HDMI_SINK)
@@ -0,0 +1,227 @@
+"""
+Pixel-exact regression tests and throughput benchmark for generate_composite_icon(),
+plus checks that show_state hands frames to the deck without touching the disk.
+
+Golden images live in test_golden/, one per color and reachable layout:
+current icon alone, current + next, and previous + current + next.
+
+Usage:
+    python -m pytest -q test_composite_icon.py
+    python test_composite_icon.py --update-golden
+    python test_composite_icon.py --benchmark
+"""
+import argparse
+import itertools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pytest
+from loguru import logger
+from PIL import Image, ImageChops
+
+import event_replay
+from conftest import HEADPHONES, SPEAKERS, make_snapshot
+
+PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(PLUGIN_DIR, "test_golden")
+
+ICONS = ["speaker", "headphones", "airpods"]
+COLORS = ["white", "black"]
+
+SETTINGS = {"sink_a": [SPEAKERS], "sink_b": [HEADPHONES], "icon_a": "Speaker", "icon_b": "Headphones"}
+
+
+def icon_filename(icon, color):
+    return f"{icon}_w.png" if color == "white" else f"{icon}.png"
+
+
+def layouts():
+    """(color, current, prev, next) for every layout show_state can produce"""
+    for color, current in itertools.product(COLORS, ICONS):
+        yield color, current, None, None
+        for next_icon in ICONS:
+            yield color, current, None, next_icon
+        for prev_icon, next_icon in itertools.product(ICONS, ICONS):
+            yield color, current, prev_icon, next_icon
+
+
+def golden_name(color, current, prev_icon, next_icon):
+    return f"{color}_{prev_icon or 'none'}_{current}_{next_icon or 'none'}.png"
+
+
+def clear_caches(action, layers=True):
+    with action._frame_cache_lock:
+        action._frame_cache.clear()
+        if layers:
+            action._layer_cache.clear()
+
+
+def render(action, color, current, prev_icon, next_icon):
+    assets = os.path.join(action.plugin_base.PATH, "assets")
+
+    def path(icon):
+        return os.path.join(assets, icon_filename(icon, color)) if icon else None
+
+    return action.generate_composite_icon(path(current), path(prev_icon), path(next_icon))
+
+
+@pytest.fixture
+def action(make_action):
+    action = make_action([])
+    clear_caches(action)
+    yield action
+    clear_caches(action)
+
+
+@pytest.mark.parametrize("layout", list(layouts()), ids=lambda layout: golden_name(*layout)[:-4])
+def test_matches_golden(action, layout):
+    image = render(action, *layout)
+    with Image.open(os.path.join(GOLDEN_DIR, golden_name(*layout))) as golden:
+        golden = golden.convert("RGBA")
+
+    assert image.mode == "RGBA"
+    assert image.size == golden.size
+    assert ImageChops.difference(image, golden).getbbox() is None
+
+
+def test_warm_cache_returns_same_frame(action):
+    first = render(action, "white", "speaker", "airpods", "headphones")
+    assert render(action, "white", "speaker", "airpods", "headphones") is first
+
+
+def test_cache_does_not_change_pixels(action):
+    cold = render(action, "black", "headphones", None, "speaker").copy()
+    # Layers cached, frame recomposed
+    clear_caches(action, layers=False)
+    warm = render(action, "black", "headphones", None, "speaker")
+    assert ImageChops.difference(cold, warm).getbbox() is None
+
+
+@pytest.fixture
+def key_action(make_action):
+    action = make_action(make_snapshot(0.0, SPEAKERS), SETTINGS)
+    clear_caches(action)
+    yield action
+    clear_caches(action)
+
+
+def test_show_state_sends_the_image(key_action):
+    sent = []
+    key_action.set_media = lambda *args, **kwargs: sent.append((args, kwargs))
+    key_action.show_state()
+
+    [(args, kwargs)] = sent
+    assert args == ()
+    assert "media_path" not in kwargs
+    assert isinstance(kwargs["image"], Image.Image)
+
+
+def test_warm_refresh_does_no_file_io(key_action, monkeypatch):
+    key_action.show_state()
+    # Same state, redrawn from the frame cache
+    key_action.old_state = None
+    touched = []
+    monkeypatch.setattr("builtins.open", lambda *args, **kwargs: touched.append(args))
+    monkeypatch.setattr(os.path, "exists", lambda path: touched.append(path))
+    key_action.show_state()
+
+    assert touched == []
+    assert len(key_action.drawn) == 2
+    assert key_action.drawn[1] is key_action.drawn[0]
+
+
+def test_persisted_frame_is_written_off_the_calling_thread(action, monkeypatch):
+    action.PERSIST_FRAMES = True
+    writers = []
+    save = Image.Image.save
+
+    def recording_save(image, *args, **kwargs):
+        writers.append(threading.current_thread())
+        save(image, *args, **kwargs)
+
+    monkeypatch.setattr(Image.Image, "save", recording_save)
+    render(action, "white", "speaker", None, "headphones")
+    for thread in threading.enumerate():
+        if thread.name == "icon-cache-writer":
+            thread.join()
+
+    assert len(writers) == 1
+    assert writers[0] is not threading.current_thread()
+    assert len([name for name in os.listdir(action.cache_dir) if name.endswith(".png")]) == 1
+
+
+# --- Golden images and benchmark ---
+
+def update_golden(action):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for layout in layouts():
+        render(action, *layout).save(os.path.join(GOLDEN_DIR, golden_name(*layout)))
+    print(f"Wrote {len(list(layouts()))} golden images to {GOLDEN_DIR}")
+
+
+def benchmark(action, frames=300):
+    """
+    Frames per second and Python heap allocated per frame, cold vs warm caches.
+
+    The allocation is the tracemalloc peak during the frame above the heap
+    size before it, so temporaries freed before returning are counted.
+    Pillow's own pixel buffers are not included.
+    """
+    all_layouts = list(layouts())
+    modes = [
+        ("cold (no cache)", lambda: clear_caches(action)),
+        ("warm layers", lambda: clear_caches(action, layers=False)),
+        ("warm frames", lambda: None),
+    ]
+    results = {}
+    for name, reset in modes:
+        # Prime, so "warm" modes start with every frame/layer cached
+        clear_caches(action)
+        for layout in all_layouts:
+            render(action, *layout)
+
+        tracemalloc.start()
+        allocated = 0
+        start = time.perf_counter()
+        for i in range(frames):
+            reset()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            render(action, *all_layouts[i % len(all_layouts)])
+            allocated += tracemalloc.get_traced_memory()[1] - before
+        elapsed = time.perf_counter() - start
+        tracemalloc.stop()
+
+        results[name] = {
+            "fps": frames / elapsed,
+            "bytes_per_frame": allocated / frames,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Composite icon golden images and benchmark")
+    parser.add_argument("--update-golden", action="store_true", help="Regenerate the golden images")
+    parser.add_argument("--benchmark", action="store_true", help="Measure compositing throughput")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    with event_replay.plugin_directory() as plugin_path:
+        action = event_replay.make_action(event_replay.load_action_class(), plugin_path, event_replay.FakePactlBackend([]))
+        if args.update_golden:
+            update_golden(action)
+        if args.benchmark:
+            # Per-frame logging would dominate the measurement
+            logger.remove()
+            for name, result in benchmark(action, args.frames).items():
+                print(f"{name:16} {result['fps']:10.1f} frames/s {result['bytes_per_frame'] / 1024:10.1f} KiB peak Python heap/frame")
+        if not (args.update_golden or args.benchmark):
+            parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
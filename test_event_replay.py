@@ -0,0 +1,176 @@
+import event_replay
+from conftest import HEADPHONES, SPEAKERS, make_snapshot, short_listing, volume_output
+
+
+def make_storm(events=200, duration=1.0):
+    """An app spamming sink-input changes, with a default sink switch halfway"""
+    recording = make_snapshot(0.0, SPEAKERS)
+    for i in range(events):
+        t = round(i * duration / events, 6)
+        recording.append({"t": t, "kind": "event", "line": f"Event 'change' on sink-input #{100 + i % 4}"})
+        if i == events // 2:
+            recording.append({"t": t, "kind": "event", "line": "Event 'change' on server #-1"})
+            recording.append({"t": t, "kind": "event", "line": "Event 'change' on sink #57"})
+            recording.extend(make_snapshot(t, HEADPHONES))
+    return recording
+
+
+def test_storm_is_coalesced():
+    recording = make_storm()
+    report = event_replay.ReplayHarness(recording, speed=5.0).run()
+
+    assert report["events"] == 202
+    # Server events are ignored, all the others are coalesced
+    assert report["refreshes"] < 30
+    assert report["renders"] <= report["refreshes"]
+    assert report["backend_calls"] <= report["refreshes"] * 5
+    assert event_replay.check_report(report, max_staleness_ms=500) == []
+
+
+def test_fake_backend_answers_as_of_replay_time():
+    backend = event_replay.FakePactlBackend(make_storm())
+    backend.now = 0.1
+    assert backend.output(["get-default-sink"]).strip() == SPEAKERS
+    backend.now = 0.9
+    assert backend.output(["get-default-sink"]).strip() == HEADPHONES
+    assert backend.calls["get-default-sink"] == 2
+
+
+def test_default_settings_use_recorded_sinks():
+    settings = event_replay.default_settings(make_storm())
+    assert settings == {
+        "sink_a": [SPEAKERS],
+        "sink_b": [HEADPHONES],
+    }
+
+
+def make_stream_burst(streams=300, duration=1.0):
+    """Apps opening streams, every third one being the voice chat app"""
+    recording = make_snapshot(0.0, SPEAKERS)
+    listing = []
+    for i in range(streams):
+        binary = "discord" if i % 3 == 0 else "firefox"
+        listing.append(
+            f"Sink Input #{1000 + i}\n"
+            f"\tSink: 56\n"
+            f"\tProperties:\n"
+            f"\t\tapplication.name = \"{binary.capitalize()}\"\n"
+            f"\t\tapplication.process.binary = \"/usr/bin/{binary}\"\n"
+        )
+    recording.append({"t": 0.0, "kind": "query", "args": ["list", "sink-inputs"], "output": "".join(listing)})
+    for i in range(streams):
+        t = round(i * duration / streams, 6)
+        recording.append({"t": t, "kind": "event", "line": f"Event 'new' on sink-input #{1000 + i}"})
+    return recording
+
+
+def test_new_streams_are_routed_in_batches():
+    recording = make_stream_burst()
+    settings = dict(event_replay.default_settings(recording), apps_b=["Discord"])
+    harness = event_replay.ReplayHarness(recording, speed=5.0, settings=settings)
+    harness.run()
+
+    moves = [command for command in harness.backend.commands if command[0] == "move-sink-input"]
+    assert sorted(int(command[1]) for command in moves) == list(range(1000, 1300, 3))
+    assert {command[2] for command in moves} == {HEADPHONES}
+    # One listing per batch, not per stream
+    assert harness.backend.calls["list sink-inputs"] < 30
+
+
+def test_no_routing_queries_without_rules():
+    harness = event_replay.ReplayHarness(make_stream_burst(), speed=5.0)
+    harness.run()
+    assert harness.backend.calls["list sink-inputs"] == 0
+
+
+MICROPHONE = "alsa_input.pci-0000_00_1f.3.analog-stereo"
+HEADSET_MICROPHONE = "alsa_input.usb-Audiophonics_SA9023-00.mono-fallback"
+SOURCES_SHORT = short_listing([SPEAKERS + ".monitor", MICROPHONE, HEADSET_MICROPHONE], first_index=60)
+
+
+def make_source_snapshot(t, default_source):
+    return make_snapshot(t, SPEAKERS) + [
+        {"t": t, "kind": "query", "args": ["list", "sources", "short"], "output": SOURCES_SHORT},
+        {"t": t, "kind": "query", "args": ["get-default-source"], "output": default_source + "\n"},
+        {"t": t, "kind": "query", "args": ["get-source-volume", "@DEFAULT_SOURCE@"], "output": volume_output()},
+    ]
+
+
+def make_mixed_storm(events=200, duration=1.0):
+    """Playback streams spamming changes while the microphone is switched"""
+    recording = make_source_snapshot(0.0, MICROPHONE)
+    for i in range(events):
+        t = round(i * duration / events, 6)
+        recording.append({"t": t, "kind": "event", "line": f"Event 'change' on sink-input #{100 + i % 4}"})
+        if i == events // 2:
+            recording.append({"t": t, "kind": "event", "line": "Event 'change' on source #62"})
+            recording.extend(make_source_snapshot(t, HEADSET_MICROPHONE))
+    recording.append({"t": duration, "kind": "event", "line": "Event 'change' on source-output #300"})
+    return recording
+
+
+def test_default_settings_for_sources_skip_monitors():
+    settings = event_replay.default_settings(make_mixed_storm(), kind="source")
+    assert settings == {
+        "device_kind": "source",
+        "source_a": [MICROPHONE],
+        "source_b": [HEADSET_MICROPHONE],
+    }
+
+
+def test_source_key_only_refreshes_on_source_events():
+    recording = make_mixed_storm()
+    settings = event_replay.default_settings(recording, kind="source")
+    report = event_replay.ReplayHarness(recording, speed=5.0, settings=settings).run()
+
+    calls = report["backend_calls_by_command"]
+    # Initial refresh, the source change and the trailing source-output event
+    assert report["refreshes"] <= 3
+    assert not any("sink" in command for command in calls)
+    assert calls["get-default-source"] == report["refreshes"]
+    assert event_replay.check_report(report, max_staleness_ms=500) == []
+
+
+def test_linked_input_follows_output_switch(make_action):
+    recording = make_source_snapshot(0.0, MICROPHONE)
+    settings = dict(
+        event_replay.default_settings(recording),
+        source_a=[MICROPHONE],
+        source_b=[HEADSET_MICROPHONE],
+    )
+    action = make_action(recording, settings)
+    action.cycle_device(1)
+    backend = action.backend
+
+    assert backend.commands == [
+        ["set-default-sink", HEADPHONES],
+        ["set-default-source", HEADSET_MICROPHONE],
+    ]
+    # The linked kind is listed once to pick its device, the refresh only queries sinks
+    assert backend.calls["list sources short"] == 1
+    assert backend.calls["get-default-source"] == 0
+
+
+def test_ignored_events_are_not_counted_as_stale():
+    """Recordings end with the recorder's own client events"""
+    recording = make_snapshot(0.0, SPEAKERS)
+    recording.append({"t": 0.0, "kind": "event", "line": "Event 'new' on client #900"})
+    recording.append({"t": 2.0, "kind": "event", "line": "Event 'change' on sink #57"})
+    recording.extend(make_snapshot(2.0, HEADPHONES))
+    recording.append({"t": 2.1, "kind": "event", "line": "Event 'remove' on client #900"})
+    recording.append({"t": 2.1, "kind": "event", "line": "Event 'new' on module #31"})
+    report = event_replay.ReplayHarness(recording, speed=10.0).run()
+
+    assert report["unrefreshed_events"] == 0
+    assert event_replay.check_report(report, max_staleness_ms=500) == []
+
+
+def test_recorder_only_snapshots_displayed_facilities():
+    assert event_replay.wants_snapshot("Event 'change' on sink #57")
+    assert event_replay.wants_snapshot("Event 'new' on source-output #12")
+    assert event_replay.wants_snapshot("Event 'change' on card #42")
+    assert event_replay.wants_snapshot("Event 'change' on server #-1")
+    # Each snapshot query is a pactl client, snapshotting those would never end
+    assert not event_replay.wants_snapshot("Event 'new' on client #900")
+    assert not event_replay.wants_snapshot("Event 'remove' on client #900")
+    assert not event_replay.wants_snapshot("Event 'new' on module #31")
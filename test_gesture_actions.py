@@ -0,0 +1,61 @@
+import pytest
+
+from conftest import HEADPHONES, SPEAKERS, make_snapshot
+
+SETTINGS = {"sink_a": [SPEAKERS], "sink_b": [HEADPHONES], "icon_a": "Speaker", "icon_b": "Headphones"}
+
+
+@pytest.fixture
+def make_gesture_action(make_action):
+    def make(volume="50"):
+        action = make_action(make_snapshot(0.0, SPEAKERS, volume=volume), SETTINGS)
+        action.steps = []
+        action.cycle_device = action.steps.append
+        return action
+    return make
+
+
+@pytest.mark.parametrize("action_id, undo_short_press, steps", [
+    ("next", False, [1]),
+    ("previous", False, [-1]),
+    # The short press already moved one forward
+    ("next", True, []),
+    ("previous", True, [-2]),
+    ("volume_up", True, [-1]),
+    ("refresh", False, []),
+])
+def test_gesture_steps(make_gesture_action, action_id, undo_short_press, steps):
+    action = make_gesture_action()
+    action.perform_gesture(action_id, undo_short_press=undo_short_press)
+    assert action.steps == steps
+
+
+@pytest.mark.parametrize("volume, command", [
+    ("50", ["set-sink-volume", "@DEFAULT_SINK@", "+5%"]),
+    ("97", ["set-sink-volume", "@DEFAULT_SINK@", "+3%"]),
+])
+def test_volume_up(make_gesture_action, volume, command):
+    action = make_gesture_action(volume)
+    assert action.perform_gesture("volume_up") is True
+    assert action.backend.commands == [command]
+
+
+def test_volume_up_stops_at_100(make_gesture_action):
+    action = make_gesture_action("100")
+    action.perform_gesture("volume_up")
+    assert action.backend.commands == []
+
+
+def test_volume_up_needs_the_current_volume(make_action):
+    # No volume query recorded, so it fails
+    recording = [entry for entry in make_snapshot(0.0, SPEAKERS) if entry["args"][0] != "get-sink-volume"]
+    action = make_action(recording, SETTINGS)
+    action.perform_gesture("volume_up")
+    assert action.backend.commands == []
+
+
+def test_volume_down(make_gesture_action):
+    action = make_gesture_action("3")
+    action.perform_gesture("volume_down")
+    assert action.backend.commands == [["set-sink-volume", "@DEFAULT_SINK@", "-5%"]]
+    assert action.backend.calls["get-sink-volume @DEFAULT_SINK@"] == 0
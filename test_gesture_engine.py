@@ -0,0 +1,117 @@
+import threading
+import time
+
+from actions.GestureEngine import GestureEngine
+
+THRESHOLD = 0.05
+WINDOW = 0.05
+REPEAT = 0.02
+
+
+class Recorder:
+    def __init__(self, repeat=False):
+        self.events = []
+        self.repeat = repeat
+        self.long_press = threading.Event()
+
+    def engine(self, **kwargs):
+        return GestureEngine(
+            on_short_press=lambda: self.events.append("short"),
+            on_long_press=self._on_long_press,
+            on_double_press=lambda: self.events.append("double"),
+            long_press_threshold=THRESHOLD,
+            double_press_window=WINDOW,
+            hold_repeat_interval=REPEAT,
+            **kwargs,
+        )
+
+    def _on_long_press(self):
+        self.events.append("long")
+        self.long_press.set()
+        return self.repeat
+
+
+def test_short_press_fires_on_release_without_delay():
+    recorder = Recorder()
+    engine = recorder.engine()
+    engine.press()
+    engine.release()
+    assert recorder.events == ["short"]
+
+
+def test_long_press_fires_at_threshold_while_held():
+    recorder = Recorder()
+    engine = recorder.engine()
+    engine.press()
+    assert recorder.long_press.wait(1)
+    assert recorder.events == ["long"]
+    engine.release()
+    assert recorder.events == ["long"]
+
+
+def test_hold_repeats_until_release():
+    recorder = Recorder(repeat=True)
+    engine = recorder.engine()
+    engine.press()
+    time.sleep(THRESHOLD + REPEAT * 5)
+    engine.release()
+    count = len(recorder.events)
+    time.sleep(REPEAT * 3)
+    assert count >= 3
+    assert len(recorder.events) == count
+    assert set(recorder.events) == {"long"}
+
+
+def test_double_press_replaces_second_short_press():
+    recorder = Recorder()
+    engine = recorder.engine()
+    for _ in range(2):
+        engine.press()
+        engine.release()
+    assert recorder.events == ["short", "double"]
+
+
+def test_slow_presses_are_two_short_presses():
+    recorder = Recorder()
+    engine = recorder.engine()
+    engine.press()
+    engine.release()
+    time.sleep(WINDOW * 2)
+    engine.press()
+    engine.release()
+    assert recorder.events == ["short", "short"]
+
+
+def test_double_press_can_be_disabled():
+    recorder = Recorder()
+    engine = recorder.engine()
+    engine.double_press_enabled = False
+    for _ in range(2):
+        engine.press()
+        engine.release()
+    assert recorder.events == ["short", "short"]
+
+
+class JumpingClock:
+    """A clock the test moves by hand, e.g. an NTP step or a resume"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_default_clock_is_monotonic():
+    assert Recorder().engine().clock is time.monotonic
+
+
+def test_clock_jump_does_not_make_a_long_press():
+    clock = JumpingClock()
+    recorder = Recorder()
+    engine = recorder.engine(clock=clock)
+    engine.press()
+    clock.now += 3600
+    engine.release()
+    assert recorder.events == ["short"]
+
@@ -0,0 +1,108 @@
+import os
+import sys
+
+import pytest
+from PIL import ImageChops
+
+import event_replay
+from conftest import HEADPHONES, SPEAKERS, make_snapshot
+
+RECORDING = make_snapshot(0.0, HEADPHONES, volume="42")
+SETTINGS = {"sink_a": [SPEAKERS], "sink_b": [HEADPHONES], "icon_a": "Speaker", "icon_b": "Headphones"}
+
+
+@pytest.fixture
+def action_class():
+    action_class = event_replay.load_action_class()
+    yield action_class
+    # Simulate a fresh process for the next test
+    with action_class._state_lock:
+        if action_class._state_write_timer is not None:
+            action_class._state_write_timer.cancel()
+            action_class._state_write_timer = None
+        action_class._last_states = None
+
+
+@pytest.fixture
+def make_persisting_action(make_action):
+    def make(recording, settings):
+        action = make_action(recording, settings)
+        action.PERSIST_STATE = True
+        return action
+    return make
+
+
+def write_states_now(action_class, action):
+    with action_class._state_lock:
+        if action_class._state_write_timer is not None:
+            action_class._state_write_timer.cancel()
+    action_class._write_last_states(os.path.join(action.cache_dir, action.STATE_FILENAME))
+
+
+def test_new_instance_draws_last_state_without_queries(action_class, make_persisting_action):
+    first = make_persisting_action(RECORDING, SETTINGS)
+    first.show_state()
+    write_states_now(action_class, first)
+    assert first.labels == ["42"]
+
+    # New process: nothing in memory, only the files in cache/
+    action_class._last_states = None
+    with action_class._frame_cache_lock:
+        action_class._frame_cache.clear()
+    second = make_persisting_action(RECORDING, SETTINGS)
+
+    assert second.show_last_known_state()
+    assert sum(second.backend.calls.values()) == 0
+    assert second.labels == ["42"]
+    assert ImageChops.difference(second.drawn[-1], first.drawn[-1]).getbbox() is None
+
+
+def test_no_last_state_for_another_configuration(action_class, make_persisting_action):
+    first = make_persisting_action(RECORDING, SETTINGS)
+    first.show_state()
+    write_states_now(action_class, first)
+
+    action_class._last_states = None
+    other = make_persisting_action(RECORDING, dict(SETTINGS, icon_b="AirPods"))
+    assert not other.show_last_known_state()
+
+
+def test_last_states_are_capped(action_class, make_persisting_action):
+    action = make_persisting_action(RECORDING, SETTINGS)
+    action.show_state()
+    kept_key = action._get_state_key(SETTINGS)
+
+    # Config edits, each one a new key, the live configuration refreshing in between
+    for i in range(action.MAX_LAST_STATES * 2):
+        action._remember_state(dict(SETTINGS, icon_c=f"edit-{i}"), {"available_slots": [0], "volume": "50"})
+        action._remember_state(SETTINGS, action._get_last_states()[kept_key])
+    write_states_now(action_class, action)
+
+    action_class._last_states = None
+    states = action._get_last_states()
+    assert len(states) == action.MAX_LAST_STATES
+    assert kept_key in states
+
+
+def test_touchscreen_state_has_no_key_frame_to_load(action_class, make_persisting_action, monkeypatch):
+    first = make_persisting_action(RECORDING, SETTINGS)
+    first.input_ident = sys.modules[action_class.__module__].Input.Touchscreen()
+    first.show_state()
+    assert first._get_last_states()[first._get_state_key(SETTINGS)]["frame"] is None
+
+    second = make_persisting_action(RECORDING, SETTINGS)
+    second.input_ident = first.input_ident
+    checked = []
+    monkeypatch.setattr(os.path, "exists", lambda path: checked.append(path) or False)
+    assert second.show_last_known_state()
+    assert checked == []
+    assert len(second.drawn) == 1
+
+
+def test_state_key_includes_the_device_kind(make_action):
+    action = make_action(RECORDING, SETTINGS)
+    icons = {"icon_a": "Speaker", "icon_b": "Headphones"}
+
+    # An input key with the same icons does not draw the output key's state
+    assert action._get_state_key(dict(icons, device_kind="source")) != action._get_state_key(icons)
+    assert action._get_state_key(dict(icons, device_kind="sink")) == action._get_state_key(icons)
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+DELAY = 0.05
+
+
+@pytest.fixture
+def action(make_action):
+    action = make_action([], {"icon_a": "Speaker"})
+    action.SETTINGS_FLUSH_DELAY = DELAY
+    action.writes = []
+    action.refreshes = 0
+    set_settings = action.set_settings
+
+    def counted_set_settings(settings):
+        action.writes.append(dict(settings))
+        set_settings(settings)
+
+    def counted_show_state():
+        action.refreshes += 1
+
+    action.set_settings = counted_set_settings
+    action.show_state = counted_show_state
+    yield action
+    action.flush_settings(refresh=False)
+
+
+def test_edits_are_written_once_after_the_pane_is_idle(action):
+    # Each edit restarts the window, so the series is written once
+    for i in range(5):
+        action.queue_settings_change({f"sink_{'abc'[i % 3]}": [f"sink-{i}"]})
+        time.sleep(DELAY / 2)
+    assert action.writes == []
+
+    time.sleep(DELAY * 3)
+    assert len(action.writes) == 1
+    assert action.get_settings() == {"icon_a": "Speaker", "sink_a": ["sink-3"], "sink_b": ["sink-4"], "sink_c": ["sink-2"]}
+    assert action.refreshes == 1
+
+
+def test_refresh_only_if_an_edit_asked_for_it(action):
+    action.queue_settings_change({"apps_a": ["discord"]}, refresh=False)
+    action.flush_settings()
+    assert action.refreshes == 0
+
+    action.queue_settings_change({"apps_a": ["spotify"]}, refresh=False)
+    action.queue_settings_change({"icon_color": "black"})
+    action.flush_settings()
+    assert action.refreshes == 1
+
+
+def test_explicit_flush_writes_now_and_cancels_the_timer(action):
+    action.queue_settings_change({"icon_color": "black"})
+    action.flush_settings()
+    assert len(action.writes) == 1
+
+    time.sleep(DELAY * 3)
+    assert len(action.writes) == 1
+
+
+def test_concurrent_flushes_keep_both_edits(action):
+    set_settings = action.set_settings
+    in_write = threading.Event()
+
+    def slow_set_settings(settings):
+        in_write.set()
+        time.sleep(DELAY)
+        set_settings(settings)
+
+    # A timer flush is in the middle of its write...
+    action.set_settings = slow_set_settings
+    action.queue_settings_change({"icon_a": "AirPods"})
+    assert in_write.wait(1)
+    # ...when the config pane flushes another edit
+    action.set_settings = set_settings
+    action.queue_settings_change({"icon_color": "black"})
+    action.flush_settings()
+
+    time.sleep(DELAY * 2)
+    assert action.get_settings() == {"icon_a": "AirPods", "icon_color": "black"}
@@ -0,0 +1,110 @@
+import sys
+import threading
+import time
+
+import pytest
+
+import event_replay
+from conftest import HEADPHONES, SPEAKERS, make_snapshot
+
+SETTINGS = {"sink_a": [SPEAKERS], "sink_b": [HEADPHONES], "icon_a": "Speaker", "icon_b": "Headphones"}
+
+
+def make_recording(available, volume="50"):
+    return make_snapshot(0.0, SPEAKERS, sinks=available, volume=volume)
+
+
+@pytest.fixture
+def make_strip_action(make_action):
+    def make(recording):
+        action = make_action(recording, SETTINGS)
+        action.input_ident = sys.modules[type(action).__module__].Input.Touchscreen()
+        action.start_event_listener = lambda: None
+        return action
+    return make
+
+
+def test_strip_dims_everything_when_no_output_is_available(make_strip_action):
+    action = make_strip_action(make_recording([SPEAKERS, HEADPHONES]))
+    action.show_state()
+    assert [key[2:4] for key in action._strip_tile_keys] == [(True, True), (True, False)]
+
+    # Both outputs unplugged
+    action._pactl_output = event_replay.FakePactlBackend(make_recording([])).output
+    action.show_state()
+    assert len(action.drawn) == 2
+    assert [key[2:4] for key in action._strip_tile_keys] == [(False, False), (False, False)]
+
+
+def test_strip_is_repainted_when_the_page_is_shown_again(make_strip_action):
+    action = make_strip_action(make_recording([SPEAKERS, HEADPHONES]))
+    action.show_state()
+    action.show_state()
+    # Nothing changed, nothing sent
+    assert len(action.drawn) == 1
+
+    action.on_ready()
+    assert len(action.drawn) == 2
+
+
+def test_tile_cache_does_not_grow_with_the_volume(make_strip_action):
+    action_class = event_replay.load_action_class()
+    with action_class._frame_cache_lock:
+        action_class._tile_cache.clear()
+    action = make_strip_action(make_recording([SPEAKERS, HEADPHONES]))
+    for volume in range(0, 101, 5):
+        action._pactl_output = event_replay.FakePactlBackend(make_recording([SPEAKERS, HEADPHONES], str(volume))).output
+        action.show_state()
+
+    assert len(action.drawn) == 21
+    # Active speaker and inactive headphones, whatever the volume
+    assert len(action_class._tile_cache) == 2
+
+
+def test_tap_selects_the_output_under_the_finger(make_strip_action):
+    action = make_strip_action(make_recording([SPEAKERS, HEADPHONES]))
+    action.show_state()
+    events = sys.modules[type(action).__module__].Input.Touchscreen.Events
+
+    action.event_callback(events.SHORT, {"x": 600, "y": 50})
+    assert action.backend.commands == [["set-default-sink", HEADPHONES]]
+
+
+def test_long_touch_does_not_switch(make_strip_action):
+    action = make_strip_action(make_recording([SPEAKERS, HEADPHONES]))
+    action.show_state()
+    events = sys.modules[type(action).__module__].Input.Touchscreen.Events
+
+    action.event_callback(events.LONG, {"x": 600, "y": 50})
+    assert action.backend.commands == []
+
+
+def test_concurrent_refreshes_keep_the_strip_consistent(make_strip_action):
+    action = make_strip_action(make_recording([SPEAKERS, HEADPHONES]))
+    render_strip_tile = action._render_strip_tile
+
+    def slow_render_strip_tile(*args):
+        # Widen the window between painting a region and recording its tile
+        time.sleep(0.001)
+        return render_strip_tile(*args)
+
+    action._render_strip_tile = slow_render_strip_tile
+    two_slots = dict(SETTINGS)
+    three_slots = dict(SETTINGS, sink_c=[SPEAKERS], icon_c="AirPods")
+    errors = []
+
+    def refresh(settings):
+        try:
+            for volume in range(20):
+                action._render_strip(settings, {0, 1}, 0, str(volume))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=refresh, args=(settings,)) for settings in [two_slots, three_slots] * 3]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(action._strip_tile_keys) == len(action._strip_slots)